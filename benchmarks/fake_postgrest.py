@@ -0,0 +1,277 @@
+"""In-memory stand-in for the subset of PostgREST the bot uses.
+
+Supports eq/neq/gt/gte/lt/lte/in/is/ilike filters, or=(...)/and=(...) groups, order
+and limit, POST with Prefer: resolution=merge-duplicates and
+return=representation, DELETE and PATCH, with optional injected latency and
+error rate.
+
+Run from the repository root:
+    python -m benchmarks.fake_postgrest --port 54321 --latency-ms 20 --error-rate 0.01
+then point the bot at it with SUPABASE_URL=http://127.0.0.1:54321
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import random
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qsl
+
+PRIMARY_KEYS = {
+    "timezones": "user_id",
+    "pomodoro_sessions": "user_id",
+    "active_pomodoros": "user_id",
+}
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}
+
+def _timestamp(value):
+    if isinstance(value, str) and "T" in value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return None
+
+def _coerce(stored, raw):
+    if raw == "null":
+        return None
+    if isinstance(stored, bool):
+        return raw.lower() == "true"
+    if isinstance(stored, int):
+        return int(raw)
+    if isinstance(stored, float):
+        return float(raw)
+    stamp, raw_stamp = _timestamp(stored), _timestamp(raw)
+    if stamp is not None and raw_stamp is not None:
+        return raw_stamp
+    return raw
+
+def _value(stored):
+    stamp = _timestamp(stored)
+    return stamp if stamp is not None else stored
+
+OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+}
+
+def _matches(row, column, expression):
+    op, _, raw = expression.partition(".")
+    stored = row.get(column)
+    if op == "in":
+        values = [v.strip('"') for v in raw.strip("()").split(",") if v]
+        return any(stored == _coerce(stored, v) for v in values)
+    if op == "is":
+        return stored is None if raw == "null" else stored == (raw == "true")
+    if op == "ilike":
+        return stored is not None and fnmatch.fnmatchcase(str(stored).lower(), raw.lower())
+    if op not in OPERATORS:
+        raise ValueError(f"unsupported operator: {op}")
+    if stored is None:
+        return False
+    return OPERATORS[op](_value(stored), _coerce(stored, raw))
+
+def _split(expression):
+    parts, current, depth = [], "", 0
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += (char == "(") - (char == ")")
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+def _matches_group(row, expression, combine):
+    results = []
+    for condition in _split(expression[1:-1]):
+        if condition.startswith(("or(", "and(")):
+            name, _, rest = condition.partition("(")
+            results.append(_matches_group(row, "(" + rest, any if name == "or" else all))
+            continue
+        column, _, rest = condition.partition(".")
+        op, _, raw = rest.partition(".")
+        raw = raw.strip('"')
+        results.append(_matches(row, column, f"{op}.{raw}"))
+    return combine(results)
+
+class FakePostgrest:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tables = {}
+        self.sequences = {}
+        self.requests = 0
+        self.errors = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def _filter(self, rows, params):
+        for column, expression in params:
+            if column in ("order", "limit", "offset", "select", "on_conflict"):
+                continue
+            if column in ("or", "and"):
+                combine = any if column == "or" else all
+                rows = [row for row in rows if _matches_group(row, expression, combine)]
+                continue
+            rows = [row for row in rows if _matches(row, column, expression)]
+        return rows
+
+    def _order(self, rows, params):
+        params = dict(params)
+        for clause in reversed(params.get("order", "").split(",")):
+            if not clause:
+                continue
+            column, _, direction = clause.partition(".")
+            rows = sorted(
+                rows,
+                key=lambda row: (row.get(column) is None, _value(row.get(column))),
+                reverse=direction.startswith("desc")
+            )
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        return rows[offset:offset + int(limit)] if limit else rows[offset:]
+
+    def handle(self, method, table, params, prefer, body):
+        rows = self.tables.setdefault(table, [])
+        if method == "GET":
+            return 200, self._order(self._filter(rows, params), params)
+
+        if method == "POST":
+            payload = body if isinstance(body, list) else [body]
+            key = PRIMARY_KEYS.get(table)
+            merge = "resolution=merge-duplicates" in prefer
+            created = []
+            for item in payload:
+                item = dict(item)
+                if key is None:
+                    key_column = "id"
+                    if item.get("id") is None:
+                        self.sequences[table] = self.sequences.get(table, 0) + 1
+                        item["id"] = self.sequences[table]
+                else:
+                    key_column = key
+                existing = next((row for row in rows if row.get(key_column) == item.get(key_column)), None)
+                if existing is not None:
+                    if not merge:
+                        return 409, {"message": "duplicate key value violates unique constraint"}
+                    existing.update(item)
+                    created.append(existing)
+                else:
+                    rows.append(item)
+                    created.append(item)
+            return 201, created
+
+        if method == "DELETE":
+            removed = self._filter(rows, params)
+            removed_ids = {id(row) for row in removed}
+            self.tables[table] = [row for row in rows if id(row) not in removed_ids]
+            return 200, removed
+
+        if method == "PATCH":
+            updated = self._filter(rows, params)
+            for row in updated:
+                row.update(body or {})
+            return 200, updated
+
+        return 400, {"message": f"unsupported method {method}"}
+
+    async def _respond(self, writer, status, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                raw = await reader.readexactly(length) if length else b""
+                body = json.loads(raw) if raw else None
+
+                self.requests += 1
+                if self.latency or self.jitter:
+                    await asyncio.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+                if self.error_rate and random.random() < self.error_rate:
+                    self.errors += 1
+                    await self._respond(writer, 503, {"message": "injected failure"})
+                    continue
+
+                url = urlsplit(target)
+                parts = [p for p in url.path.split("/") if p]
+                if len(parts) != 3 or parts[:2] != ["rest", "v1"]:
+                    await self._respond(writer, 404, {"message": f"unknown path {url.path}"})
+                    continue
+
+                params = parse_qsl(url.query, keep_blank_values=True)
+                prefer = headers.get("prefer", "")
+                try:
+                    status, rows = self.handle(method.upper(), parts[2], params, prefer, body)
+                except (ValueError, TypeError) as e:
+                    await self._respond(writer, 400, {"message": str(e)})
+                    continue
+
+                if status >= 400:
+                    await self._respond(writer, status, rows)
+                elif method.upper() != "GET" and "return=representation" not in prefer:
+                    await self._respond(writer, 201 if status == 201 else 204)
+                else:
+                    await self._respond(writer, status, rows)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fake PostgREST server for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FakePostgrest(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate)
+    port = await server.start(args.host, args.port)
+    print(f"Fake PostgREST listening on http://{args.host}:{port}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
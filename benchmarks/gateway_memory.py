@@ -0,0 +1,157 @@
+"""Compare the resident memory of the gateway profiles at several guild sizes.
+
+Each case runs in a fresh interpreter. It builds a bot with the profile's
+options and feeds its connection state synthetic GUILD_CREATE payloads shaped
+like what Discord sends for those intents (members only when the members
+intent is on) plus recent MESSAGE_CREATE events when message intents are on,
+then reports the RSS growth.
+
+Run from the repository root:
+    python -m benchmarks.gateway_memory --guilds 20 --sizes 100 1000 10000
+"""
+import argparse
+import asyncio
+import gc
+import subprocess
+import sys
+
+from utils.gateway import GATEWAY_PROFILES
+
+def rss():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def user(user_id):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None}
+
+def member(user_id):
+    return {
+        "user": user(user_id),
+        "roles": [],
+        "joined_at": "2025-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+def guild_payload(guild_id, size, bot_id, with_members):
+    base = guild_id * 1_000_000
+    return {
+        "id": str(guild_id),
+        "name": f"guild{guild_id}",
+        "owner_id": str(base + 1),
+        "member_count": size,
+        "large": size >= 250,
+        "features": [],
+        "emojis": [],
+        "stickers": [],
+        "roles": [{
+            "id": str(guild_id),
+            "name": "@everyone",
+            "permissions": "0",
+            "position": 0,
+            "color": 0,
+            "hoist": False,
+            "managed": False,
+            "mentionable": False,
+        }],
+        "channels": [{
+            "id": str(base + 2),
+            "type": 0,
+            "name": "general",
+            "position": 0,
+            "permission_overwrites": [],
+        }],
+        "members": [member(bot_id)] + ([member(base + 10 + i) for i in range(size)] if with_members else []),
+        "voice_states": [],
+        "threads": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+    }
+
+def message_payload(guild_id, message_id, author_id):
+    return {
+        "id": str(message_id),
+        "channel_id": str(guild_id * 1_000_000 + 2),
+        "guild_id": str(guild_id),
+        "author": user(author_id),
+        "content": "hello " * 10,
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+async def run_case(profile, guilds, size, messages):
+    import discord
+    from discord.ext import commands
+    from utils.gateway import gateway_options
+
+    options = gateway_options(profile)
+    bot = commands.Bot(command_prefix="!", **options)
+    state = bot._connection
+    bot_id = 1
+    state.user = discord.ClientUser(state=state, data=user(bot_id))
+    intents = options["intents"]
+
+    gc.collect()
+    before = rss()
+
+    for guild_id in range(1, guilds + 1):
+        guild = state._add_guild_from_data(guild_payload(guild_id, size, bot_id, intents.members))
+        if state._messages is not None and intents.guild_messages:
+            channel = guild.text_channels[0]
+            for i in range(messages):
+                data = message_payload(guild_id, guild_id * 10_000_000 + i, guild_id * 1_000_000 + 10 + i % max(size, 1))
+                state._messages.append(discord.Message(state=state, channel=channel, data=data))
+
+    gc.collect()
+    after = rss()
+    cached_members = sum(len(g.members) for g in bot.guilds)
+    cached_messages = len(state._messages) if state._messages is not None else 0
+    print(f"{profile},{size},{(after - before) / 1024 / 1024:.1f},{cached_members},{cached_messages}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare RSS of the gateway profiles")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--messages", type=int, default=1000, help="messages seen per guild")
+    parser.add_argument("--case", nargs=2, metavar=("PROFILE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        profile, size = args.case
+        asyncio.run(run_case(profile, args.guilds, int(size), args.messages))
+        return
+
+    print(f"{args.guilds} guilds, {args.messages} messages seen per guild")
+    print(f"{'profile':<10}{'members/guild':>15}{'RSS MiB':>10}{'members':>10}{'messages':>10}")
+    for size in args.sizes:
+        for profile in GATEWAY_PROFILES:
+            result = subprocess.run(
+                [sys.executable, "-m", "benchmarks.gateway_memory",
+                 "--guilds", str(args.guilds), "--messages", str(args.messages), "--case", profile, str(size)],
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                print(f"{profile:<10}{size:>15}  failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            _, _, mib, members, messages = result.stdout.strip().splitlines()[-1].split(",")
+            print(f"{profile:<10}{size:>15}{mib:>10}{members:>10}{messages:>10}")
+
+if __name__ == "__main__":
+    main()
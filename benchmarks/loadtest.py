@@ -0,0 +1,248 @@
+"""Drive the cogs' command handlers with simulated interactions and report
+throughput and p50/p99 latency per command.
+
+By default a FakePostgrest server is started in-process; pass --url to use an
+already running one, or --backend sqlite to measure the local backend.
+
+Run from the repository root:
+    python -m benchmarks.loadtest --users 10000 --duration 30 --concurrency 200 --latency-ms 20
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from benchmarks.fake_postgrest import FakePostgrest
+from cogs.general import General
+from cogs.pomodoro import Pomodoro
+from cogs.reminders import Reminders, ReminderModal
+from cogs.tasks import Tasks, TaskModal
+from models.database import Database
+from models.pomodoro import active_pomodoro_sessions
+from models.postgrest import PostgrestStorage
+
+_message_ids = itertools.count(1)
+
+class FakeMessage:
+    def __init__(self):
+        self.id = next(_message_ids)
+
+    async def edit(self, **kwargs):
+        pass
+
+class FakeChannel:
+    def get_partial_message(self, message_id):
+        return FakeMessage()
+
+    async def send(self, **kwargs):
+        return FakeMessage()
+
+class FakeDMs:
+    def remember(self, user):
+        pass
+
+    async def get_dm_channel(self, user_id):
+        return FakeChannel()
+
+    async def send(self, user_id, **kwargs):
+        return FakeMessage()
+
+class FakeBot:
+    def __init__(self):
+        self.dms = FakeDMs()
+        self.user = SimpleNamespace(id=0, name="loadtest")
+
+    def get_user(self, user_id):
+        return None
+
+class FakeResponse:
+    def __init__(self):
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, *args, **kwargs):
+        self.done = True
+
+    async def send_modal(self, modal):
+        self.done = True
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+    async def edit_message(self, **kwargs):
+        self.done = True
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs):
+        return FakeMessage()
+
+class FakeInteraction:
+    def __init__(self, bot, user_id, command):
+        self.client = bot
+        self.user = SimpleNamespace(id=user_id, name=f"user{user_id}", dm_channel=None)
+        self.command = SimpleNamespace(qualified_name=command)
+        self.created_at = datetime.now().astimezone()
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+        self.extras = {}
+
+    async def edit_original_response(self, **kwargs):
+        return FakeMessage()
+
+    async def delete_original_response(self):
+        pass
+
+def text_input(value):
+    return SimpleNamespace(value=value)
+
+def build_commands(bot):
+    general = General(bot)
+    tasks = Tasks(bot)
+    reminders = Reminders(bot)
+    pomodoro = Pomodoro(bot)
+
+    async def task_add(interaction):
+        modal = TaskModal()
+        modal.task = text_input(f"Task {random.randint(1, 10**6)}")
+        modal.priority = text_input(str(random.randint(1, 3)))
+        await modal.on_submit(interaction)
+
+    async def task_list(interaction):
+        await tasks.task_list.callback(tasks, interaction)
+
+    async def task_search(interaction):
+        await tasks.task_search.callback(tasks, interaction, f"task {random.randint(100, 999)}")
+
+    async def reminder_add(interaction):
+        when = datetime.now() + timedelta(days=1, minutes=random.randint(0, 60 * 24 * 30))
+        modal = ReminderModal(reminders.scheduler)
+        modal.date = text_input(when.strftime("%Y-%m-%d"))
+        modal.time = text_input(when.strftime("%H:%M"))
+        modal.message = text_input("Load test reminder")
+        await modal.on_submit(interaction)
+
+    async def reminder_list(interaction):
+        await reminders.reminder_list.callback(reminders, interaction)
+
+    async def set_timezone(interaction):
+        await general.set_timezone.callback(general, interaction, random.randint(-12, 14))
+
+    async def pomodoro_toggle(interaction):
+        if interaction.user.id in active_pomodoro_sessions:
+            await pomodoro.pomodoro_stop.callback(pomodoro, interaction)
+        else:
+            await pomodoro.pomodoro_start.callback(pomodoro, interaction)
+
+    async def pomodoro_status(interaction):
+        await pomodoro.pomodoro_status.callback(pomodoro, interaction)
+
+    return {
+        "task add": (15, task_add),
+        "task list": (25, task_list),
+        "task search": (5, task_search),
+        "reminder add": (10, reminder_add),
+        "reminder list": (20, reminder_list),
+        "set_timezone": (5, set_timezone),
+        "pomodoro start/stop": (10, pomodoro_toggle),
+        "pomodoro status": (15, pomodoro_status),
+    }
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+async def run_load(bot, commands, users, duration, concurrency):
+    names = list(commands)
+    weights = [commands[name][0] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            interaction = FakeInteraction(bot, random.randint(1, users), name)
+            started = time.perf_counter()
+            try:
+                await commands[name][1](interaction)
+            except Exception as e:
+                errors[name] += 1
+                if errors[name] == 1:
+                    print(f"{name} failed: {e!r}")
+                continue
+            latencies[name].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+def report(latencies, errors, elapsed):
+    print(f"\n{'command':<22}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    total = 0
+    for name, values in latencies.items():
+        total += len(values)
+        print(
+            f"{name:<22}{len(values):>8}{len(values) / elapsed:>10.1f}"
+            f"{percentile(values, 0.50) * 1000:>10.2f}{percentile(values, 0.99) * 1000:>10.2f}"
+            f"{(max(values) if values else 0) * 1000:>10.2f}{errors[name]:>8}"
+        )
+    print(f"{'total':<22}{total:>8}{total / elapsed:>10.1f}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the bot's command handlers")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--backend", choices=("postgrest", "sqlite"), default="postgrest")
+    parser.add_argument("--url", help="use an already running PostgREST-compatible server")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--write-behind", action="store_true", help="batch inserts through the write-behind buffer")
+    args = parser.parse_args()
+
+    server = None
+    if args.backend == "sqlite":
+        from models.sqlite import SQLiteStorage
+        Database.storage = SQLiteStorage(os.path.join(tempfile.mkdtemp(), "loadtest.db"))
+    else:
+        url = args.url
+        if url is None:
+            server = FakePostgrest(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate)
+            url = f"http://127.0.0.1:{await server.start()}"
+        Database.storage = PostgrestStorage(
+            base_url=url,
+            headers={"Content-Type": "application/json", "Prefer": "resolution=merge-duplicates"}
+        )
+
+    if args.no_cache:
+        Database.cache.maxsize = 0
+    Database.write_behind = args.write_behind
+
+    await Database.open()
+    try:
+        bot = FakeBot()
+        commands = build_commands(bot)
+        latencies, errors, elapsed = await run_load(bot, commands, args.users, args.duration, args.concurrency)
+        report(latencies, errors, elapsed)
+        print(f"\nstorage: {Database.storage_stats()}")
+        print(f"cache: {Database.cache_stats()}")
+        if server:
+            print(f"server: {server.requests} requests, {server.errors} injected errors")
+    finally:
+        await Database.close()
+        if server:
+            await server.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""Compare the memory held by 100k live pomodoro sessions and reminders as
+raw PostgREST rows versus the typed record models.
+
+Run from the repository root: python -m benchmarks.memory [count]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from models.pomodoro import PomodoroSession, PomodoroState
+from models.records import Reminder
+
+def reminder_payload(count):
+    # Encoded up front so each measurement decodes its own rows, as when they
+    # arrive from PostgREST, and nothing is shared with rows kept outside it.
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return json.dumps([
+        {
+            "id": i,
+            "user_id": 100000000000000000 + i,
+            "message": f"Reminder number {i}",
+            "remind_at": (start + timedelta(minutes=i)).isoformat()
+        }
+        for i in range(count)
+    ])
+
+def unslotted(cls):
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name not in cls.__slots__ and name not in ("__slots__", "__dict__", "__weakref__")
+    }
+    return type(f"Unslotted{cls.__name__}", (), namespace)
+
+def measure(label, build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    objects = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {current / 1024 / 1024:8.1f} MiB {current / len(objects):8.0f} B/item {elapsed:6.2f}s")
+    return objects
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} items each")
+
+    payload = reminder_payload(count)
+    measure("reminders as JSON dicts", lambda: json.loads(payload))
+    measure("reminders as Reminder records", lambda: [Reminder.from_row(row) for row in json.loads(payload)])
+    del payload
+
+    def sessions(cls):
+        built = []
+        for i in range(count):
+            session = cls(100000000000000000 + i)
+            session.start_phase(PomodoroState.WORKING)
+            built.append(session)
+        return built
+
+    measure("sessions without __slots__", lambda: sessions(unslotted(PomodoroSession)))
+    measure("sessions with __slots__", lambda: sessions(PomodoroSession))
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from models.database import Database
+from models.errors import describe
+from utils.interactions import deadline_aware, reply
 
 class General(commands.Cog):
     def __init__(self, bot):
@@ -21,9 +23,11 @@ class General(commands.Cog):
                     __Task Commands__
                     `/task add` - Add a task with a certain priority from 1 to 3
                     `/task list` - View all your tasks
+                    `/task search` - Find tasks containing some words
+                    `/task import` - Add tasks from a CSV or text file
 
                     __Reminder Commands__
-                    `/reminder add` - Set a reminder for a certain time
+                    `/reminder add` - Set a reminder for a certain time, optionally repeating
                     `/reminder list` - View all your reminders
 
                     __Pomodoro Commands__
@@ -40,9 +44,11 @@ class General(commands.Cog):
 
     @app_commands.command(name="set_timezone", description="Set your timezone offset from UTC")
     @app_commands.describe(offset="Your UTC offset in hours (e.g., -5 for EST, 0 for UTC, 2 for EET)")
+    @deadline_aware()
     async def set_timezone(self, interaction: discord.Interaction, offset: int):
         if offset < -12 or offset > 14:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error",
                     description="Offset must be between -12 and +14",
@@ -54,16 +60,18 @@ class General(commands.Cog):
         try:
             await Database.set_user_timezone(interaction.user.id, offset)
         except Exception as e:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error",
-                    description=f"Failed to set timezone: {e}",
+                    description=f"Failed to set timezone: {describe(e)}",
                     color=0xff0000
                 ),
                 ephemeral=True
             )
 
-        await interaction.response.send_message(
+        await reply(
+            interaction,
             embed=discord.Embed(
                 title="✅ Timezone Set",
                 description=f"Your timezone offset is now UTC {offset:+d}",
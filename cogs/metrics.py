@@ -0,0 +1,69 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from models.database import Database
+from utils.metrics import registry
+
+class Metrics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="metrics", description="Show bot performance metrics (owner only)")
+    async def metrics(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            return await interaction.response.send_message(
+                embed=discord.Embed(
+                    title="❌ Not Allowed",
+                    description="Only the bot owner can view metrics.",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        lines = registry.summary()
+        lines.append(f"storage {Database.storage_stats()}")
+        lines.append(f"cache {Database.cache_stats()}")
+        lines.append(f"dms {self.bot.dms.stats()}")
+
+        desc = "\n".join(lines) or "No metrics recorded yet."
+        if len(desc) > 4000:
+            desc = desc[:3997] + "..."
+
+        await interaction.response.send_message(
+            embed=discord.Embed(
+                title="📊 Metrics",
+                description=f"```\n{desc}\n```",
+                color=0xffffff
+            ),
+            ephemeral=True
+        )
+
+    @app_commands.command(name="stalls", description="Show what has been blocking the event loop (owner only)")
+    async def stalls(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            return await interaction.response.send_message(
+                embed=discord.Embed(
+                    title="❌ Not Allowed",
+                    description="Only the bot owner can view metrics.",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        report = self.bot.watchdog.report()
+        desc = "\n".join(
+            f"{worst:.2f}s max, {total / count:.2f}s avg, {count}x - `{name}`"
+            for name, count, total, worst in report
+        ) or "No event loop stalls recorded."
+
+        await interaction.response.send_message(
+            embed=discord.Embed(
+                title="🐢 Slowest Handlers",
+                description=desc[:4000],
+                color=0xffffff
+            ),
+            ephemeral=True
+        )
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
@@ -1,10 +1,26 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
+import heapq
+import itertools
+import math
+import time
+from config import (
+    POMODORO_REFRESH_INTERVAL,
+    POMODORO_MAX_REFRESH_INTERVAL,
+    POMODORO_EDITS_PER_SECOND,
+    POMODORO_CHECKPOINT_INTERVAL,
+)
 from models.database import Database
+from models.errors import StorageError, describe
 from models.pomodoro import PomodoroSession, PomodoroState, active_pomodoro_sessions
+from models.records import PomodoroSettings
 from utils.helpers import format_remaining_time, create_progress_bar
+from utils.ratelimit import TokenBucket
+from utils.sharding import CLUSTERED, owns_user
+from utils.metrics import ACTIVE_POMODOROS, DISCORD_REQUEST_SECONDS
+from utils.interactions import deadline_aware, reply
 
 class PomodoroSettingsModal(discord.ui.Modal, title='Pomodoro Settings'):
     work_duration = discord.ui.TextInput(
@@ -39,6 +55,7 @@ class PomodoroSettingsModal(discord.ui.Modal, title='Pomodoro Settings'):
         max_length=2
     )
 
+    @deadline_aware(ephemeral=True)
     async def on_submit(self, interaction: discord.Interaction):
         try:
             work = int(self.work_duration.value)
@@ -47,7 +64,8 @@ class PomodoroSettingsModal(discord.ui.Modal, title='Pomodoro Settings'):
             sessions = int(self.sessions_before_long_break.value)
 
             if work < 1 or break_dur < 1 or long_break < 1 or sessions < 1:
-                return await interaction.response.send_message(
+                return await reply(
+                    interaction,
                     embed=discord.Embed(
                         title="❌ Invalid Values",
                         description="All values must be at least 1",
@@ -64,7 +82,8 @@ class PomodoroSettingsModal(discord.ui.Modal, title='Pomodoro Settings'):
                 sessions
             )
 
-            await interaction.response.send_message(
+            await reply(
+                interaction,
                 embed=discord.Embed(
                     title="✅ Pomodoro Settings Saved",
                     description=f"Work: {work} min, Break: {break_dur} min, Long Break: {long_break} min, Sessions: {sessions}",
@@ -74,7 +93,8 @@ class PomodoroSettingsModal(discord.ui.Modal, title='Pomodoro Settings'):
             )
 
         except ValueError:
-            await interaction.response.send_message(
+            await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Invalid Input",
                     description="Please enter valid numbers",
@@ -83,35 +103,36 @@ class PomodoroSettingsModal(discord.ui.Modal, title='Pomodoro Settings'):
                 ephemeral=True
             )
         except Exception as e:
-            await interaction.response.send_message(
+            await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error Saving Settings",
-                    description=f"Failed to save settings: {e}",
+                    description=f"Failed to save settings: {describe(e)}",
                     color=0xff0000
                 ),
                 ephemeral=True
             )
 
-async def update_pomodoro_message(session, minutes, seconds):
+def render_pomodoro_message(session):
     if session.state == PomodoroState.WORKING:
-        total_duration = session.work_duration * 60
         title = "🍅 Pomodoro Session"
         emoji = "🔴"
     elif session.state == PomodoroState.SHORT_BREAK:
-        total_duration = session.break_duration * 60
         title = "☕ Short Break"
         emoji = "🟢"
     else:
-        total_duration = session.long_break_duration * 60
         title = "🌴 Long Break"
         emoji = "🟢"
 
-    progress = 1 - (session.remaining_time / total_duration)
+    remaining = session.remaining_time
+    minutes = math.ceil(remaining / 60)
+    progress = min(max(1 - (remaining / session.phase_duration()), 0), 1)
     progress_bar = create_progress_bar(progress)
+    ends_at = int(time.time() + remaining)
 
     embed = discord.Embed(
         title=title,
-        description=f"{emoji} **{minutes:02d}:{seconds:02d}** remaining\n{progress_bar}",
+        description=f"{emoji} **{minutes} min** remaining (ends <t:{ends_at}:R>)\n{progress_bar}",
         color=0xffffff if session.state == PomodoroState.WORKING else 0x00ff00
     ).add_field(
         name="Completed Sessions",
@@ -119,84 +140,361 @@ async def update_pomodoro_message(session, minutes, seconds):
         inline=True
     ).set_footer(text="Type /pomodoro stop to end your session")
 
-    if session.message:
-        try:
-            await session.message.edit(embed=embed)
-        except:
-            session.message = await session.bot.get_user(session.user_id).send(embed=embed)
-    else:
-        session.message = await session.bot.get_user(session.user_id).send(embed=embed)
-
-async def pomodoro_timer(session):
-    while session.state != PomodoroState.IDLE and session.remaining_time > 0:
-        minutes = session.remaining_time // 60
-        seconds = session.remaining_time % 60
+    return embed, (session.state, session.completed_sessions, minutes, progress_bar)
 
-        if session.remaining_time % 5 == 0:
-            await update_pomodoro_message(session, minutes, seconds)
-
-        await asyncio.sleep(1)
-        session.remaining_time -= 1
-
-    if session.state != PomodoroState.IDLE:
-        if session.state == PomodoroState.WORKING:
-            session.completed_sessions += 1
-            embed = discord.Embed(
-                title="✅ Work Session Complete!",
-                description="Time for a break!",
-                color=0x00ff00
-            )
+class ProgressUpdater:
+    def __init__(self, dms, budget, min_interval=5, max_interval=60):
+        self.dms = dms
+        self.budget = budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
 
-            if session.completed_sessions >= session.sessions_before_long_break:
-                session.state = PomodoroState.LONG_BREAK
-                session.remaining_time = session.long_break_duration * 60
-                embed.add_field(
-                    name="Next",
-                    value=f"Long break: {session.long_break_duration} minutes",
-                    inline=False
-                )
-            else:
-                session.state = PomodoroState.SHORT_BREAK
-                session.remaining_time = session.break_duration * 60
-                embed.add_field(
-                    name="Next",
-                    value=f"Short break: {session.break_duration} minutes",
-                    inline=False
-                )
+    def interval(self, session):
+        base = min(max(session.phase_duration() / 25, self.min_interval), self.max_interval)
+        return base * (1 + 3 * (1 - self.budget.headroom()))
 
-            await session.bot.get_user(session.user_id).send(embed=embed)
+    def request(self, session):
+        if session.edit_in_flight:
+            session.edit_pending = True
+            return False
+        session.edit_in_flight = True
+        return True
 
-        else:
-            session.state = PomodoroState.WORKING
-            session.remaining_time = session.work_duration * 60
+    async def update(self, session):
+        try:
+            while True:
+                session.edit_pending = False
+                await self._apply(session)
+                if not session.edit_pending or session.state == PomodoroState.IDLE:
+                    break
+        except Exception as e:
+            print(f"Failed to update pomodoro message for {session.user_id}: {e}")
+        finally:
+            session.edit_in_flight = False
+
+    async def _apply(self, session):
+        # A session stopped while its update was queued has no phase left to
+        # show.
+        if session.state == PomodoroState.IDLE or not session.phase_duration():
+            return
+        if session.message is None and session.message_id:
+            channel = await self.dms.get_dm_channel(session.user_id)
+            session.message = channel.get_partial_message(session.message_id)
+
+        embed, rendered = render_pomodoro_message(session)
+        if session.message and rendered == session.last_render:
+            return
+        if not self.budget.try_acquire():
+            return
+
+        if session.message:
+            try:
+                with DISCORD_REQUEST_SECONDS.time("edit"):
+                    await session.message.edit(embed=embed)
+                session.last_render = rendered
+                return
+            except discord.NotFound:
+                session.message = None
+                session.message_id = None
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.budget.penalize(getattr(e, "retry_after", 1) or 1)
+                print(f"Failed to edit pomodoro message for {session.user_id}: {e}")
+                return
+
+        if session.message_generation == session.generation:
+            return
+        session.message_generation = session.generation
+        session.message = await self.dms.send(session.user_id, embed=embed)
+        session.message_id = session.message.id
+        session.dirty = True
+        session.last_render = rendered
+
+def advance_pomodoro_phase(session):
+    if session.advance() == PomodoroState.WORKING:
+        embed = discord.Embed(
+            title="✅ Work Session Complete!",
+            description="Time for a break!",
+            color=0x00ff00
+        )
 
-            embed = discord.Embed(
-                title="🔔 Break Time Over!",
-                description="Time to get back to work!",
-                color=0xff9900
+        if session.state == PomodoroState.LONG_BREAK:
+            embed.add_field(
+                name="Next",
+                value=f"Long break: {session.long_break_duration} minutes",
+                inline=False
             )
+        else:
             embed.add_field(
                 name="Next",
-                value=f"Work session: {session.work_duration} minutes",
+                value=f"Short break: {session.break_duration} minutes",
                 inline=False
             )
 
-            await session.bot.get_user(session.user_id).send(embed=embed)
+    else:
+        embed = discord.Embed(
+            title="🔔 Break Time Over!",
+            description="Time to get back to work!",
+            color=0xff9900
+        )
+        embed.add_field(
+            name="Next",
+            value=f"Work session: {session.work_duration} minutes",
+            inline=False
+        )
 
-        session.task = asyncio.create_task(pomodoro_timer(session))
+    return embed
+
+PHASE_END = 0
+REFRESH = 1
+
+class PomodoroEngine:
+    def __init__(self, sessions, updater):
+        self.sessions = sessions
+        self.updater = updater
+        self._heap = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner = None
+        self._pending = set()
+        self.removed = set()
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+        for task in self._pending:
+            task.cancel()
+        self._heap.clear()
+
+    def add(self, session, state=PomodoroState.WORKING):
+        session.start_phase(state)
+        self.resume(session)
+
+    def resume(self, session):
+        self.sessions[session.user_id] = session
+        self.removed.discard(session.user_id)
+        self.schedule_phase(session)
+
+    def remove(self, user_id):
+        session = self.sessions.pop(user_id, None)
+        if session:
+            session.stop()
+            self.removed.add(user_id)
+        return session
+
+    def forget(self, user_id):
+        session = self.sessions.pop(user_id, None)
+        if session:
+            session.stop()
+        return session
+
+    def take_checkpoint(self):
+        rows = []
+        for session in self.sessions.values():
+            if session.dirty:
+                session.dirty = False
+                rows.append(session.to_row())
+        removed, self.removed = self.removed, set()
+        return rows, removed
+
+    def restore_checkpoint(self, rows, removed):
+        for row in rows:
+            session = self.sessions.get(int(row["user_id"]))
+            if session:
+                session.dirty = True
+        self.removed |= {user_id for user_id in removed if user_id not in self.sessions}
+
+    def schedule_phase(self, session):
+        self._push(session.phase_ends_at, session, PHASE_END)
+        self._push(time.monotonic(), session, REFRESH)
+
+    def _push(self, when, session, kind):
+        seq = next(self._counter)
+        heapq.heappush(self._heap, (when, seq, session.user_id, session.generation, kind))
+        if self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _notify(self, session, embed):
+        try:
+            await self.updater.dms.send(session.user_id, embed=embed)
+        except Exception as e:
+            print(f"Failed to notify {session.user_id} of pomodoro phase change: {e}")
+
+    def process(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            _, _, user_id, generation, kind = heapq.heappop(self._heap)
+            session = self.sessions.get(user_id)
+            if session is None or session.generation != generation:
+                continue
+
+            if kind == PHASE_END:
+                embed = advance_pomodoro_phase(session)
+                self._spawn(self._notify(session, embed))
+                self.schedule_phase(session)
+            else:
+                if self.updater.request(session):
+                    self._spawn(self.updater.update(session))
+                next_refresh = now + self.updater.interval(session)
+                if next_refresh < session.phase_ends_at:
+                    self._push(next_refresh, session, REFRESH)
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            self.process(time.monotonic())
+
+            timeout = max(self._heap[0][0] - time.monotonic(), 0) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
 class Pomodoro(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.engine = PomodoroEngine(
+            active_pomodoro_sessions,
+            ProgressUpdater(
+                bot.dms,
+                TokenBucket(POMODORO_EDITS_PER_SECOND, burst=POMODORO_EDITS_PER_SECOND * 2),
+                min_interval=POMODORO_REFRESH_INTERVAL,
+                max_interval=POMODORO_MAX_REFRESH_INTERVAL
+            )
+        )
+        self.restored = False
+        ACTIVE_POMODOROS.set_function(lambda: len(active_pomodoro_sessions))
+
+    async def cog_load(self):
+        self.engine.start()
+        self.restored = await self.restore_sessions()
+        self.checkpoint_sessions.start()
+
+    def load_session(self, row, now=None):
+        try:
+            session = PomodoroSession.from_row(row)
+        except (KeyError, ValueError) as e:
+            print(f"Skipping unreadable pomodoro checkpoint for {row.get('user_id')}: {e}")
+            return None
+        if session.catch_up(now):
+            session.dirty = True
+        return session
+
+    def adopt(self, row, now=None):
+        session = self.load_session(row, now)
+        if session:
+            self.engine.resume(session)
+        return session
+
+    async def restore_sessions(self):
+        # Returns False when storage is unavailable; the checkpoint loop then
+        # tries again instead of the cog failing to load.
+        try:
+            rows = await Database.get_active_pomodoros()
+        except StorageError as e:
+            print(f"Failed to restore pomodoro sessions, will retry: {e}")
+            return False
+
+        now = time.time()
+        for row in rows or []:
+            user_id = int(row["user_id"])
+            if user_id not in active_pomodoro_sessions and user_id not in self.engine.removed:
+                self.adopt(row, now)
+        print(f"Restored {len(active_pomodoro_sessions)} pomodoro sessions")
+        return True
+
+    async def sync_owned_sessions(self):
+        try:
+            rows = await Database.get_active_pomodoros()
+        except StorageError as e:
+            print(f"Failed to sync owned pomodoro sessions: {e}")
+            return
+        if rows is None:
+            return
+
+        now = time.time()
+        persisted = set()
+        for row in rows:
+            user_id = int(row["user_id"])
+            persisted.add(user_id)
+            if user_id not in active_pomodoro_sessions and user_id not in self.engine.removed:
+                self.adopt(row, now)
+
+        # A session that has been saved before but whose row is gone was
+        # stopped on another instance; unsaved changes must not bring it back.
+        for user_id, session in list(active_pomodoro_sessions.items()):
+            if user_id not in persisted and (session.persisted or not session.dirty):
+                self.engine.forget(user_id)
+
+    async def find_session(self, user_id):
+        session = active_pomodoro_sessions.get(user_id)
+        if session or not CLUSTERED or user_id in self.engine.removed:
+            return session
+
+        row = await Database.get_active_pomodoro(user_id)
+        if row is None:
+            return None
+        if owns_user(user_id):
+            return self.adopt(row)
+        return self.load_session(row)
+
+    async def checkpoint(self):
+        rows, removed = self.engine.take_checkpoint()
+        try:
+            if rows:
+                await Database.save_active_pomodoros(rows)
+                for row in rows:
+                    session = self.engine.sessions.get(int(row["user_id"]))
+                    if session:
+                        session.persisted = True
+            if removed:
+                await Database.delete_active_pomodoros(removed)
+        except Exception as e:
+            print(f"Failed to checkpoint pomodoro sessions: {e}")
+            self.engine.restore_checkpoint(rows, removed)
+
+    @tasks.loop(seconds=POMODORO_CHECKPOINT_INTERVAL)
+    async def checkpoint_sessions(self):
+        if not self.restored:
+            self.restored = await self.restore_sessions()
+        # Deletions made by other instances are picked up before this
+        # instance writes its own sessions back.
+        if CLUSTERED:
+            await self.sync_owned_sessions()
+        await self.checkpoint()
 
     pomodoro = app_commands.Group(name="pomodoro", description="Pomodoro timer commands")
 
+    async def cog_app_command_error(self, interaction: discord.Interaction, error):
+        error = getattr(error, "original", error)
+        if not isinstance(error, StorageError):
+            return
+        interaction.extras["error_handled"] = True
+        print(f"Pomodoro command failed for {interaction.user.id}: {error}")
+        embed = discord.Embed(
+            title="❌ Error",
+            description=f"Couldn't reach your Pomodoro session: {describe(error)}",
+            color=0xff0000
+        )
+        await reply(interaction, embed=embed, ephemeral=True)
+
     @pomodoro.command(name="start", description="Start a Pomodoro session")
+    @deadline_aware(ephemeral=True)
     async def pomodoro_start(self, interaction: discord.Interaction):
         user_id = interaction.user.id
 
-        if user_id in active_pomodoro_sessions:
-            return await interaction.response.send_message(
+        if await self.find_session(user_id):
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Session Already Active",
                     description="You already have an active Pomodoro session. Use `/pomodoro stop` to end it first.",
@@ -205,31 +503,17 @@ class Pomodoro(commands.Cog):
                 ephemeral=True
             )
 
-        settings = await Database.get_pomodoro_settings(user_id)
-        if not settings:
-            settings = {
-                "work_duration": 25,
-                "break_duration": 5,
-                "long_break_duration": 15,
-                "sessions_before_long_break": 4
-            }
-
-        session = PomodoroSession(
-            user_id=user_id,
-            work_duration=settings["work_duration"],
-            break_duration=settings["break_duration"],
-            long_break_duration=settings["long_break_duration"],
-            sessions_before_long_break=settings["sessions_before_long_break"]
-        )
-        session.bot = self.bot
-
-        session.state = PomodoroState.WORKING
-        session.remaining_time = session.work_duration * 60
-        session.task = asyncio.create_task(pomodoro_timer(session))
-
-        active_pomodoro_sessions[user_id] = session
+        settings = await Database.get_pomodoro_settings(user_id) or PomodoroSettings()
+        session = PomodoroSession.from_settings(user_id, settings)
+        if owns_user(user_id):
+            self.bot.dms.remember(interaction.user)
+            self.engine.add(session)
+        else:
+            session.start_phase(PomodoroState.WORKING)
+            await Database.save_active_pomodoros([session.to_row()])
 
-        await interaction.response.send_message(
+        await reply(
+            interaction,
             embed=discord.Embed(
                 title="🍅 Pomodoro Started",
                 description=f"Work session started for {session.work_duration} minutes!",
@@ -239,11 +523,13 @@ class Pomodoro(commands.Cog):
         )
 
     @pomodoro.command(name="stop", description="Stop your current Pomodoro session")
+    @deadline_aware(ephemeral=True)
     async def pomodoro_stop(self, interaction: discord.Interaction):
         user_id = interaction.user.id
 
-        if user_id not in active_pomodoro_sessions:
-            return await interaction.response.send_message(
+        if not await self.find_session(user_id):
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ No Active Session",
                     description="You don't have an active Pomodoro session.",
@@ -252,15 +538,13 @@ class Pomodoro(commands.Cog):
                 ephemeral=True
             )
 
-        session = active_pomodoro_sessions[user_id]
-        session.state = PomodoroState.IDLE
-
-        if session.task:
-            session.task.cancel()
-
-        del active_pomodoro_sessions[user_id]
+        if owns_user(user_id):
+            self.engine.remove(user_id)
+        else:
+            await Database.delete_active_pomodoros([user_id])
 
-        await interaction.response.send_message(
+        await reply(
+            interaction,
             embed=discord.Embed(
                 title="⏹️ Pomodoro Stopped",
                 description="Your Pomodoro session has been stopped.",
@@ -274,11 +558,14 @@ class Pomodoro(commands.Cog):
         await interaction.response.send_modal(PomodoroSettingsModal())
 
     @pomodoro.command(name="status", description="Check your current Pomodoro session status")
+    @deadline_aware(ephemeral=True)
     async def pomodoro_status(self, interaction: discord.Interaction):
         user_id = interaction.user.id
+        session = await self.find_session(user_id)
 
-        if user_id not in active_pomodoro_sessions:
-            return await interaction.response.send_message(
+        if not session:
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ No Active Session",
                     description="You don't have an active Pomodoro session.",
@@ -287,10 +574,9 @@ class Pomodoro(commands.Cog):
                 ephemeral=True
             )
 
-        session = active_pomodoro_sessions[user_id]
-
-        minutes = session.remaining_time // 60
-        seconds = session.remaining_time % 60
+        remaining = session.remaining_time
+        minutes = remaining // 60
+        seconds = remaining % 60
 
         if session.state == PomodoroState.WORKING:
             state_str = "Work Session"
@@ -320,12 +606,12 @@ class Pomodoro(commands.Cog):
             inline=True
         )
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await reply(interaction, embed=embed, ephemeral=True)
 
-    def cog_unload(self):
-        for user_id, session in active_pomodoro_sessions.items():
-            if session.task:
-                session.task.cancel()
+    async def cog_unload(self):
+        self.checkpoint_sessions.cancel()
+        self.engine.stop()
+        await self.checkpoint()
         active_pomodoro_sessions.clear()
 
 async def setup(bot):
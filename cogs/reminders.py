@@ -1,10 +1,28 @@
 import discord
+import asyncio
+from dataclasses import replace
 from discord import app_commands
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+from discord.ext import commands
+from datetime import datetime, timedelta, timezone
+from config import (
+    REMINDER_LOOKAHEAD,
+    REMINDER_REFETCH_INTERVAL,
+    REMINDER_CATCHUP,
+    REMINDER_SEND_CONCURRENCY,
+    REMINDER_MAX_ATTEMPTS,
+    REMINDER_RETRY_DELAY,
+    REMINDER_LEASE,
+)
 from models.database import Database
-from utils.views import DeletableDropdown
-from utils.helpers import validate_date_format, validate_time_format
+from models.errors import StorageError, describe
+from utils.views import PaginatedList
+from utils.helpers import line_budget, truncate, validate_date_format, validate_time_format
+from utils.scheduler import ReminderScheduler
+from utils.sharding import owns_user
+from utils.recurrence import following, next_occurrence, normalize_rule
+from utils.metrics import REMINDER_DISPATCH_LAG
+from utils.interactions import deadline_aware, reply
+from utils.resilience import backoff
 
 class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
     date = discord.ui.TextInput(
@@ -29,9 +47,40 @@ class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
         max_length=200
     )
 
+    repeat = discord.ui.TextInput(
+        label='Repeat (optional)',
+        placeholder='daily, weekly, weekdays or cron: 30 9 * * 1-5',
+        required=False,
+        max_length=50
+    )
+
+    def __init__(self, scheduler=None, offset_lookup=None):
+        super().__init__()
+        self.scheduler = scheduler
+        self.offset_lookup = offset_lookup
+        if offset_lookup is not None:
+            offset_lookup.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def user_offset(self, user_id):
+        # Prefer the lookup started when the modal was opened; a failed one is
+        # read again rather than reported.
+        if self.offset_lookup is not None:
+            lookup, self.offset_lookup = self.offset_lookup, None
+            try:
+                return await lookup
+            except StorageError as e:
+                print(f"Prefetched timezone lookup for {user_id} failed, reading it again: {e}")
+        return await Database.get_user_timezone(user_id)
+
+    def schedule(self, reminder):
+        if self.scheduler and owns_user(reminder.user_id):
+            self.scheduler.add(reminder)
+
+    @deadline_aware()
     async def on_submit(self, interaction: discord.Interaction):
         if not validate_date_format(self.date.value):
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Invalid Date Format",
                     description="Please use YYYY-MM-DD format (e.g., 2025-07-10)",
@@ -41,7 +90,8 @@ class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
             )
 
         if not validate_time_format(self.time.value):
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Invalid Time Format",
                     description="Please use HH:MM format (e.g., 02:31)",
@@ -51,7 +101,7 @@ class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
             )
 
         try:
-            offset = await Database.get_user_timezone(interaction.user.id)
+            offset = await self.user_offset(interaction.user.id)
 
             user_dt = datetime.strptime(
                 f"{self.date.value} {self.time.value}",
@@ -62,7 +112,8 @@ class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
             remind_time = user_dt - timedelta(hours=offset)
 
             if remind_time < now:
-                return await interaction.response.send_message(
+                return await reply(
+                    interaction,
                     embed=discord.Embed(
                         title="❌ Time Travel Error",
                         description="You can't set reminders in the past!",
@@ -71,7 +122,8 @@ class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
                     ephemeral=True
                 )
         except ValueError as e:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Date/Time Error",
                     description=f"Invalid date/time: {e}",
@@ -79,60 +131,152 @@ class ReminderModal(discord.ui.Modal, title='Set New Reminder'):
                 ),
                 ephemeral=True
             )
+        except StorageError as e:
+            print(f"Failed to look up the timezone of {interaction.user.id}: {e}")
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Error Setting Reminder",
+                    description=f"Failed to look up your timezone: {describe(e)}",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        recurrence = None
+        rule = " ".join(self.repeat.value.lower().split())
+        if rule:
+            # The first occurrence snaps forward to the rule's first match, so
+            # a weekdays reminder set for a Saturday starts on Monday. Rules
+            # that can never fire (e.g. 30 February) are rejected here.
+            try:
+                recurrence = normalize_rule(rule, user_dt)
+                first = next_occurrence(recurrence, offset, remind_time.replace(tzinfo=timezone.utc) - timedelta(minutes=1))
+            except ValueError as e:
+                return await reply(
+                    interaction,
+                    embed=discord.Embed(
+                        title="❌ Invalid Repeat Rule",
+                        description=f"{e}. Use daily, weekly, weekdays or a cron rule like `30 9 * * 1-5`.",
+                        color=0xff0000
+                    ),
+                    ephemeral=True
+                )
+
+            remind_time = first.replace(tzinfo=None)
+            user_dt = remind_time + timedelta(hours=offset)
 
         try:
             await Database.add_reminder(
                 interaction.user.id,
                 self.message.value,
-                remind_time.isoformat() + 'Z'
+                remind_time.isoformat() + 'Z',
+                on_saved=self.schedule,
+                recurrence=recurrence,
+                utc_offset=offset
             )
         except Exception as e:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error Setting Reminder",
-                    description=f"Failed to set reminder: {e}",
+                    description=f"Failed to set reminder: {describe(e)}",
                     color=0xff0000
                 ),
                 ephemeral=True
             )
 
         local_time = user_dt.strftime("%Y-%m-%d %H:%M")
-        await interaction.response.send_message(
+        repeats = f" and then repeat on `{recurrence}`" if recurrence else ""
+        await reply(
+            interaction,
             embed=discord.Embed(
                 title="✅ Reminder Set",
-                description=f"I'll remind you on **{local_time}** about:\n{self.message.value}",
+                description=f"I'll remind you on **{local_time}**{repeats} about:\n{self.message.value}",
                 color=0x00ff00
             )
         )
 
+def render_reminder_page(reminders, offset, utc_offset):
+    budget = line_budget(len(reminders))
+    lines = []
+    for i, r in enumerate(reminders, offset + 1):
+        local_time = (r.remind_at + timedelta(hours=utc_offset)).strftime('%Y-%m-%d %H:%M')
+        # The rule shares the line's budget with the message.
+        repeats = f" 🔁 `{truncate(r.recurrence, budget // 2)}`" if r.recurrence else ""
+        lines.append(f"{i}. `{local_time}`{repeats} - {truncate(r.message, max(budget - len(repeats), 10))}")
+    return discord.Embed(
+        title=f"⏰ Your Reminders ({offset + 1}-{offset + len(reminders)})",
+        description="\n".join(lines),
+        color=0xffffff
+    )
+
 class Reminders(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.check_reminders.start()
+        self.settling = set()
+        self.scheduler = ReminderScheduler(
+            Database.get_due_reminders,
+            self.deliver_reminders,
+            lookahead=REMINDER_LOOKAHEAD,
+            refetch_interval=REMINDER_REFETCH_INTERVAL,
+            catchup=REMINDER_CATCHUP,
+            max_attempts=REMINDER_MAX_ATTEMPTS,
+            retry_delay=REMINDER_RETRY_DELAY,
+            give_up=self.postpone_reminders
+        )
+
+    async def cog_load(self):
+        self.scheduler.start()
 
     reminder = app_commands.Group(name="reminder", description="Manage your reminders")
 
     @reminder.command(name="add", description="Set a new reminder")
     async def reminder_add(self, interaction: discord.Interaction):
-        await interaction.response.send_modal(ReminderModal())
+        # The timezone is read while the user fills in the modal, so submitting
+        # only waits on the insert.
+        offset_lookup = asyncio.ensure_future(Database.get_user_timezone(interaction.user.id))
+        await interaction.response.send_modal(ReminderModal(self.scheduler, offset_lookup))
 
     @reminder.command(name="list", description="View your reminders")
+    @deadline_aware()
     async def reminder_list(self, interaction: discord.Interaction):
         try:
-            offset = await Database.get_user_timezone(interaction.user.id)
-            reminders = await Database.get_reminders(interaction.user.id)
+            offset, (items, more) = await Database.get_reminder_overview(interaction.user.id)
+            view = PaginatedList(
+                interaction.user.id,
+                Database.get_reminder_page,
+                key=lambda r: (r.remind_at, r.id),
+                render=lambda reminders, start: render_reminder_page(reminders, start, offset),
+                is_task=False,
+                on_delete=self.scheduler.discard
+            )
+            loaded = items is not None and view.show(items, more)
         except Exception as e:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error",
-                    description=f"Failed to fetch reminders: {e}",
+                    description=f"Failed to fetch reminders: {describe(e)}",
                     color=0xff0000
                 ),
                 ephemeral=True
             )
 
-        if not reminders:
-            return await interaction.response.send_message(
+        if not loaded:
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Error",
+                    description="Failed to fetch reminders, please try again.",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        if not view.items:
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="⏰ Your Reminders",
                     description="You have no reminders set!",
@@ -140,60 +284,128 @@ class Reminders(commands.Cog):
                 )
             )
 
-        formatted_reminders = []
-        for r in reminders:
-            utc_time = datetime.fromisoformat(r['remind_at'].replace('Z', '+00:00'))
-            local_time = (utc_time + timedelta(hours=offset)).strftime('%Y-%m-%d %H:%M')
-            formatted_reminders.append(f"`{local_time}` - {r['message']}")
+        await reply(interaction, embed=view.embed(), view=view)
 
-        desc = "\n".join(f"{i+1}. {r}" for i, r in enumerate(formatted_reminders))
+    async def send_reminder(self, reminder, semaphore):
+        user_id = reminder.user_id
+        async with semaphore:
+            try:
+                embed = discord.Embed(
+                    title="🔔 Reminder",
+                    description=reminder.message,
+                    color=0xffffff
+                )
+                await self.bot.dms.send(user_id, embed=embed)
+                REMINDER_DISPATCH_LAG.observe((datetime.now(timezone.utc) - reminder.remind_at).total_seconds())
+                return True
+            except (discord.Forbidden, discord.NotFound) as e:
+                print(f"Cannot deliver reminder {reminder.id} to {user_id}: {e}")
+                return None
+            except Exception as e:
+                print(f"Failed to send reminder to {user_id}: {e}")
+                return False
 
-        view = DeletableDropdown(reminders, is_task=False)
-        await interaction.response.send_message(
-            embed=discord.Embed(
-                title=f"⏰ Your Reminders ({len(reminders)})",
-                description=desc,
-                color=0xffffff
-            ),
-            view=view
-        )
+    async def deliver_reminders(self, reminders):
+        try:
+            claimed = await Database.claim_reminders([r.id for r in reminders])
+        except StorageError as e:
+            print(f"Failed to claim {len(reminders)} due reminders: {e}")
+            return reminders
+
+        if len(claimed) < len(reminders):
+            # Held by another process for now; picked up again by a later
+            # refill if the row is still there once that claim lapses.
+            print(f"Skipping {len(reminders) - len(claimed)} reminders claimed by another instance for now")
+            for reminder in reminders:
+                if reminder.id not in claimed:
+                    self.scheduler.release(reminder)
+            reminders = [r for r in reminders if r.id in claimed]
 
-    @tasks.loop(minutes=1)
-    async def check_reminders(self):
-        from utils.helpers import get_utc_timestamps
+        semaphore = asyncio.Semaphore(REMINDER_SEND_CONCURRENCY)
+        results = await asyncio.gather(*(self.send_reminder(r, semaphore) for r in reminders))
 
-        one_min_ago_str, now_str = get_utc_timestamps()
+        # A user who cannot be reached (ok is None) will not become reachable
+        # by retrying, so those reminders are settled like delivered ones.
+        await self.settle_reminders([r for r, ok in zip(reminders, results) if ok is not False])
+        return [r for r, ok in zip(reminders, results) if ok is False]
 
+    async def postpone_reminders(self, reminders):
+        # Reminders the scheduler gave up on after transient send failures
+        # were never delivered. They keep their row, lose this process's claim
+        # and move REMINDER_REFETCH_INTERVAL seconds ahead, so a later refill
+        # (here or on another process) tries them again.
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=REMINDER_REFETCH_INTERVAL)
+        postponed = [replace(r, remind_at=retry_at) for r in reminders]
         try:
-            reminders = await Database.get_due_reminders(one_min_ago_str, now_str)
+            await Database.reschedule_reminders(postponed)
         except Exception as e:
-            print(f"Failed to fetch reminders: {e}")
+            print(f"Failed to postpone {len(postponed)} undelivered reminders: {e}")
             return
+        print(f"Postponed {len(postponed)} undelivered reminders until {retry_at:%H:%M:%S} UTC")
+        for reminder in postponed:
+            self.scheduler.add(reminder)
+
+    async def settle_reminders(self, reminders):
+        # One-shot reminders are deleted and recurring ones move on to their
+        # next occurrence. Until that is stored the rows still look due, so a
+        # failure is retried in the background rather than left for another
+        # process to send again once the claim lapses.
+        unsettled = await self._settle(reminders)
+        if unsettled:
+            task = asyncio.create_task(self.settle_later(unsettled))
+            self.settling.add(task)
+            task.add_done_callback(self.settling.discard)
 
-        for reminder in reminders:
-            user_id = reminder["user_id"]
-            message = reminder["message"]
+    async def _settle(self, reminders):
+        # Returns the reminders that could not be settled.
+        unsettled = []
+        once = [r for r in reminders if not r.recurrence]
+        if once:
             try:
-                user = await self.bot.fetch_user(user_id)
-                embed = discord.Embed(
-                    title="🔔 Reminder",
-                    description=message,
-                    color=0xffffff
+                await Database.delete_reminders(
+                    [r.id for r in once],
+                    [r.user_id for r in once]
                 )
-                await user.send(embed=embed)
             except Exception as e:
-                print(f"Failed to send reminder to {user_id}: {e}")
+                print(f"Failed to delete {len(once)} finished reminders: {e}")
+                unsettled.extend(once)
 
-        for reminder in reminders:
+        now = datetime.now(timezone.utc)
+        recurring = [r for r in reminders if r.recurrence]
+        upcoming = [replace(r, remind_at=following(r.recurrence, r.utc_offset, r.remind_at, now)) for r in recurring]
+        if upcoming:
             try:
-                rid = reminder.get("id")
-                if rid:
-                    await Database.delete_reminder(rid)
+                await Database.reschedule_reminders(upcoming)
             except Exception as e:
-                print(f"Failed to delete reminder {rid}: {e}")
+                print(f"Failed to reschedule {len(upcoming)} recurring reminders: {e}")
+                unsettled.extend(recurring)
+            else:
+                for reminder in upcoming:
+                    self.scheduler.add(reminder)
+        return unsettled
+
+    async def settle_later(self, reminders):
+        # Each attempt first renews this process's claim, and attempts come
+        # well within REMINDER_LEASE, so the lease stays held while storage
+        # is reachable at all.
+        attempt = 0
+        while reminders:
+            await asyncio.sleep(backoff(attempt, base=1, cap=REMINDER_LEASE / 4))
+            attempt += 1
+            try:
+                await Database.claim_reminders([r.id for r in reminders])
+            except StorageError as e:
+                print(f"Failed to renew the claim on {len(reminders)} sent reminders: {e}")
+                continue
+            reminders = await self._settle(reminders)
+        print(f"Settled sent reminders after {attempt} retries")
 
     def cog_unload(self):
-        self.check_reminders.cancel()
+        self.scheduler.stop()
+        if self.settling:
+            print(f"Stopping with {len(self.settling)} batches of sent reminders not yet settled")
+        for task in self.settling:
+            task.cancel()
 
 async def setup(bot):
     await bot.add_cog(Reminders(bot))
@@ -1,8 +1,13 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+from config import BULK_CHUNK_SIZE, TASK_IMPORT_MAX_ROWS, TASK_IMPORT_MAX_BYTES
 from models.database import Database
-from utils.views import DeletableDropdown
+from models.errors import describe
+from utils.helpers import line_budget, truncate
+from utils.views import PaginatedList
+from utils.interactions import deadline_aware, reply
+from utils.taskimport import is_csv, is_text, parse_record, read_records, stream_lines
 
 class TaskModal(discord.ui.Modal, title='Add New Task'):
     task = discord.ui.TextInput(
@@ -20,9 +25,11 @@ class TaskModal(discord.ui.Modal, title='Add New Task'):
         max_length=1
     )
 
+    @deadline_aware()
     async def on_submit(self, interaction: discord.Interaction):
         if self.priority.value not in ('1', '2', '3'):
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Invalid Priority",
                     description="Priority must be 1, 2, or 3",
@@ -38,16 +45,18 @@ class TaskModal(discord.ui.Modal, title='Add New Task'):
                 int(self.priority.value)
             )
         except Exception as e:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error Adding Task",
-                    description=f"Failed to add task: {e}",
+                    description=f"Failed to add task: {describe(e)}",
                     color=0xff0000
                 ),
                 ephemeral=True
             )
 
-        await interaction.response.send_message(
+        await reply(
+            interaction,
             embed=discord.Embed(
                 title="✅ Task Added",
                 description=f"**{self.task.value}** (Priority {self.priority.value})",
@@ -55,6 +64,18 @@ class TaskModal(discord.ui.Modal, title='Add New Task'):
             )
         )
 
+def render_task_page(tasks, offset):
+    budget = line_budget(len(tasks))
+    desc = "\n".join(
+        f"{i}. **{truncate(t.task, budget)}** (Priority {t.priority})"
+        for i, t in enumerate(tasks, offset + 1)
+    )
+    return discord.Embed(
+        title=f"📝 Your Tasks ({offset + 1}-{offset + len(tasks)})",
+        description=desc,
+        color=0xffffff
+    )
+
 class Tasks(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -66,21 +87,42 @@ class Tasks(commands.Cog):
         await interaction.response.send_modal(TaskModal())
 
     @task.command(name="list", description="View your tasks")
+    @deadline_aware()
     async def task_list(self, interaction: discord.Interaction):
+        view = PaginatedList(
+            interaction.user.id,
+            Database.get_task_page,
+            key=lambda t: t.id,
+            render=render_task_page,
+            is_task=True
+        )
         try:
-            tasks = await Database.get_tasks(interaction.user.id)
+            loaded = await view.load()
         except Exception as e:
-            return await interaction.response.send_message(
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="❌ Error",
-                    description=f"Failed to fetch tasks: {e}",
+                    description=f"Failed to fetch tasks: {describe(e)}",
                     color=0xff0000
                 ),
                 ephemeral=True
             )
 
-        if not tasks:
-            return await interaction.response.send_message(
+        if not loaded:
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Error",
+                    description="Failed to fetch tasks, please try again.",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        if not view.items:
+            return await reply(
+                interaction,
                 embed=discord.Embed(
                     title="📝 Your Tasks",
                     description="You have no tasks! 🎉",
@@ -88,19 +130,112 @@ class Tasks(commands.Cog):
                 )
             )
 
-        desc = "\n".join(
-            f"{i+1}. **{t['task']}** (Priority {t['priority']})"
-            for i, t in enumerate(tasks)
-        )
+        await reply(interaction, embed=view.embed(), view=view)
+
+    @task.command(name="search", description="Find tasks containing some words")
+    @app_commands.describe(query="Words to look for in your tasks")
+    @deadline_aware()
+    async def task_search(self, interaction: discord.Interaction, query: app_commands.Range[str, 1, 100]):
+        try:
+            tasks = await Database.search_tasks(interaction.user.id, query)
+        except Exception as e:
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Error",
+                    description=f"Failed to search tasks: {describe(e)}",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
 
-        view = DeletableDropdown(tasks, is_task=True)
-        await interaction.response.send_message(
+        if not tasks:
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="🔍 Task Search",
+                    description=f"No tasks match **{truncate(query, 100)}**.",
+                    color=0xffffff
+                ),
+                ephemeral=True
+            )
+
+        budget = line_budget(len(tasks))
+        await reply(
+            interaction,
             embed=discord.Embed(
-                title=f"📝 Your Tasks ({len(tasks)})",
-                description=desc,
+                title=f"🔍 Tasks matching \"{truncate(query, 100)}\"",
+                description="\n".join(f"• **{truncate(t.task, budget)}** (Priority {t.priority})" for t in tasks),
                 color=0xffffff
+            )
+        )
+
+    @task.command(name="import", description="Add tasks from a CSV or text file, one per line")
+    @app_commands.describe(file="CSV with task,priority columns, or a text file with one task per line")
+    @deadline_aware(ephemeral=True)
+    async def task_import(self, interaction: discord.Interaction, file: discord.Attachment):
+        if not is_text(file) or file.size > TASK_IMPORT_MAX_BYTES:
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Unsupported File",
+                    description=f"Attach a .csv or .txt file of at most {TASK_IMPORT_MAX_BYTES // 1024} KiB.",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        # Rows are inserted a chunk at a time while the file is still
+        # downloading, so each request carries up to BULK_CHUNK_SIZE tasks.
+        csv_format = is_csv(file)
+        imported, batch, skipped, capped = 0, [], [], False
+        try:
+            lines = stream_lines(file.url, TASK_IMPORT_MAX_BYTES)
+            async for line_number, fields in read_records(lines, csv_format):
+                try:
+                    parsed = parse_record(fields, csv_format)
+                except ValueError as e:
+                    skipped.append(f"line {line_number}: {e}")
+                    continue
+                if parsed is None:
+                    continue
+                if imported + len(batch) >= TASK_IMPORT_MAX_ROWS:
+                    capped = True
+                    break
+                batch.append(parsed)
+                if len(batch) >= BULK_CHUNK_SIZE:
+                    await Database.add_tasks(interaction.user.id, batch)
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                await Database.add_tasks(interaction.user.id, batch)
+                imported += len(batch)
+        except Exception as e:
+            print(f"Task import for {interaction.user.id} failed after {imported} rows: {e}")
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Import Failed",
+                    description=f"Imported {imported} tasks before failing: {describe(e)}",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+
+        lines = [f"Imported **{imported}** task{'s' if imported != 1 else ''}."]
+        if capped:
+            lines.append(f"Stopped at the limit of {TASK_IMPORT_MAX_ROWS} tasks per import.")
+        if skipped:
+            lines.append(f"Skipped {len(skipped)} line{'s' if len(skipped) != 1 else ''}:")
+            lines.extend(f"• {truncate(reason, 100)}" for reason in skipped[:5])
+        await reply(
+            interaction,
+            embed=discord.Embed(
+                title="📥 Tasks Imported",
+                description="\n".join(lines),
+                color=0x00ff00 if imported else 0xffffff
             ),
-            view=view
+            ephemeral=True
         )
 
 async def setup(bot):
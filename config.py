@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,3 +12,78 @@ HEADERS = {
     "Content-Type": "application/json",
     "Prefer": "resolution=merge-duplicates"
 }
+
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '20'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+HTTP2 = os.getenv('HTTP2', 'false').lower() in ('1', 'true', 'yes')
+
+CACHE_TTL = float(os.getenv('CACHE_TTL', '300'))
+CLUSTER_CACHE_TTL = float(os.getenv('CLUSTER_CACHE_TTL', '5'))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
+
+REMINDER_LOOKAHEAD = float(os.getenv('REMINDER_LOOKAHEAD', '300'))
+REMINDER_REFETCH_INTERVAL = float(os.getenv('REMINDER_REFETCH_INTERVAL', '120'))
+REMINDER_CATCHUP = float(os.getenv('REMINDER_CATCHUP', '120'))
+
+REMINDER_SEND_CONCURRENCY = int(os.getenv('REMINDER_SEND_CONCURRENCY', '10'))
+REMINDER_MAX_ATTEMPTS = int(os.getenv('REMINDER_MAX_ATTEMPTS', '3'))
+REMINDER_RETRY_DELAY = float(os.getenv('REMINDER_RETRY_DELAY', '30'))
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '200'))
+
+POMODORO_REFRESH_INTERVAL = float(os.getenv('POMODORO_REFRESH_INTERVAL', '5'))
+POMODORO_MAX_REFRESH_INTERVAL = float(os.getenv('POMODORO_MAX_REFRESH_INTERVAL', '60'))
+POMODORO_EDITS_PER_SECOND = float(os.getenv('POMODORO_EDITS_PER_SECOND', '10'))
+
+DM_CACHE_SIZE = int(os.getenv('DM_CACHE_SIZE', '10000'))
+DM_CACHE_TTL = float(os.getenv('DM_CACHE_TTL', '3600'))
+POMODORO_CHECKPOINT_INTERVAL = float(os.getenv('POMODORO_CHECKPOINT_INTERVAL', '30'))
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'postgrest').lower()
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'taskforce.db')
+
+SHARD_COUNT = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', '1'))
+CLUSTER_ID = int(os.getenv('CLUSTER_ID', '0'))
+OWNERSHIP_BUCKETS = int(os.getenv('OWNERSHIP_BUCKETS', '1024'))
+
+INSTANCE_ID = os.getenv('INSTANCE_ID') or f"{socket.gethostname()}-{CLUSTER_ID}"
+REMINDER_LEASE = float(os.getenv('REMINDER_LEASE', '120'))
+# Reminders whose claim lapsed must still fall inside the refill window.
+REMINDER_CATCHUP = max(REMINDER_CATCHUP, REMINDER_LEASE)
+
+LIST_PAGE_SIZE = min(int(os.getenv('LIST_PAGE_SIZE', '10')), 25)
+
+WRITE_BEHIND = os.getenv('WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_INTERVAL = float(os.getenv('WRITE_BEHIND_INTERVAL', '0.5'))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv('WRITE_BEHIND_MAX_PENDING', '200'))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', '3'))
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None
+
+LOOP_WATCHDOG = os.getenv('LOOP_WATCHDOG', 'true').lower() in ('1', 'true', 'yes')
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', '0.25'))
+LOOP_LAG_THRESHOLD = float(os.getenv('LOOP_LAG_THRESHOLD', '0.5'))
+
+COMMAND_HASH_PATH = os.getenv('COMMAND_HASH_PATH', '.command_tree_hash')
+
+GATEWAY_PROFILE = os.getenv('GATEWAY_PROFILE', 'full').lower()
+
+DB_RETRIES = int(os.getenv('DB_RETRIES', '2'))
+DB_RETRY_BASE = float(os.getenv('DB_RETRY_BASE', '0.1'))
+DB_RETRY_MAX = float(os.getenv('DB_RETRY_MAX', '2'))
+BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', '5'))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', '15'))
+HEDGE_AFTER = float(os.getenv('HEDGE_AFTER', '0'))
+
+OVERVIEW_RPC = os.getenv('OVERVIEW_RPC', 'false').lower() in ('1', 'true', 'yes')
+
+INTERACTION_DEFER_AFTER = float(os.getenv('INTERACTION_DEFER_AFTER', '2'))
+
+TASK_SEARCH = os.getenv('TASK_SEARCH', 'ilike').lower()
+TASK_SEARCH_LIMIT = min(int(os.getenv('TASK_SEARCH_LIMIT', '10')), 25)
+
+TASK_IMPORT_MAX_ROWS = int(os.getenv('TASK_IMPORT_MAX_ROWS', '5000'))
+TASK_IMPORT_MAX_BYTES = int(os.getenv('TASK_IMPORT_MAX_BYTES', '1048576'))
@@ -2,27 +2,96 @@ import os
 from dotenv import load_dotenv
 
 import discord
+from discord import app_commands
 from discord.ext import commands
-from discord import Intents
+from config import (
+    DM_CACHE_SIZE,
+    DM_CACHE_TTL,
+    SHARD_COUNT,
+    CLUSTER_COUNT,
+    CLUSTER_ID,
+    METRICS_HOST,
+    METRICS_PORT,
+    LOOP_WATCHDOG,
+    LOOP_LAG_INTERVAL,
+    LOOP_LAG_THRESHOLD,
+    COMMAND_HASH_PATH,
+    GATEWAY_PROFILE,
+)
+from models.database import Database
+from utils.messaging import DMResolver
+from utils.sharding import cluster_shard_ids
+from utils.commandsync import sync_if_changed
+from utils.gateway import gateway_options
+from utils.metrics import MetricsServer, registry
+from utils.watchdog import LoopWatchdog
 
 load_dotenv()
 
-bot = commands.Bot(command_prefix='!', intents=Intents.all())
+# Errors a cog has already answered (marked with extras["error_handled"]) are
+# not logged a second time; everything else goes to the default handler.
+class TaskforceTree(app_commands.CommandTree):
+    async def on_error(self, interaction, error):
+        if interaction.extras.get("error_handled"):
+            return
+        await super().on_error(interaction, error)
+
+class TaskforceBot(commands.AutoShardedBot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dms = DMResolver(self, maxsize=DM_CACHE_SIZE, ttl=DM_CACHE_TTL)
+        self.metrics_server = None
+        self.watchdog = LoopWatchdog(interval=LOOP_LAG_INTERVAL, threshold=LOOP_LAG_THRESHOLD)
+
+    async def setup_hook(self):
+        if LOOP_WATCHDOG:
+            self.watchdog.start()
+        await Database.open()
+        if METRICS_PORT is not None:
+            self.metrics_server = MetricsServer(registry, METRICS_HOST, METRICS_PORT)
+            await self.metrics_server.start()
+
+        await load_cogs()
+        if CLUSTER_ID == 0:
+            await sync_commands()
+
+    async def close(self):
+        await super().close()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await Database.close()
+        self.watchdog.stop()
+
+bot = TaskforceBot(
+    command_prefix='!',
+    tree_cls=TaskforceTree,
+    **gateway_options(GATEWAY_PROFILE),
+    shard_count=SHARD_COUNT,
+    shard_ids=cluster_shard_ids()
+)
 
 async def load_cogs():
     await bot.load_extension("cogs.general")
     await bot.load_extension("cogs.tasks")
     await bot.load_extension("cogs.reminders")
     await bot.load_extension("cogs.pomodoro")
+    await bot.load_extension("cogs.metrics")
 
-@bot.event
-async def on_ready():
-    print(f"Bot is ready: {bot.user.name} ({bot.user.id})")
-    await load_cogs()
+async def sync_commands():
     try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} commands")
+        synced = await sync_if_changed(bot.tree, bot.application_id, COMMAND_HASH_PATH)
     except Exception as e:
         print(f"Error syncing commands: {e}")
+        return
+
+    if synced is None:
+        print("Command tree unchanged, skipping sync")
+    else:
+        print(f"Synced {len(synced)} commands")
+
+@bot.event
+async def on_ready():
+    print(f"Bot is ready: {bot.user.name} ({bot.user.id})")
+    print(f"Cluster {CLUSTER_ID + 1}/{CLUSTER_COUNT} running shards {sorted(bot.shards)} of {bot.shard_count}")
 
 bot.run(os.getenv('DISCORD_TOKEN'))
@@ -1,111 +1,312 @@
-import json
-import httpx
-from config import SUPABASE_URL, HEADERS
+import asyncio
+from datetime import datetime, timedelta, timezone
+from config import (
+    CACHE_TTL,
+    CLUSTER_CACHE_TTL,
+    CACHE_MAX_ENTRIES,
+    STORAGE_BACKEND,
+    SQLITE_PATH,
+    INSTANCE_ID,
+    REMINDER_LEASE,
+    LIST_PAGE_SIZE,
+    TASK_SEARCH_LIMIT,
+    WRITE_BEHIND,
+    WRITE_BEHIND_INTERVAL,
+    WRITE_BEHIND_MAX_PENDING,
+    WRITE_BEHIND_MAX_ATTEMPTS,
+    BULK_CHUNK_SIZE,
+)
+from models.records import Task, Reminder, PomodoroSettings, parse_rows
+from models.writebehind import WriteBehindBuffer
+from utils.cache import TTLCache, _MISSING
+from utils.helpers import to_utc_string
+from utils.search import search_terms, rank
+from utils.sharding import CLUSTERED, user_bucket, bucket_filter
+
+def create_storage(backend=STORAGE_BACKEND):
+    if backend == "postgrest":
+        from models.postgrest import PostgrestStorage
+        return PostgrestStorage()
+    elif backend == "sqlite":
+        from models.sqlite import SQLiteStorage
+        return SQLiteStorage(SQLITE_PATH)
+    raise ValueError(f"Unknown storage backend: {backend}")
 
 class Database:
+    storage = create_storage()
+    # Other processes write the same rows and cannot invalidate this cache,
+    # so in a cluster entries only live CLUSTER_CACHE_TTL seconds.
+    cache = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=min(CACHE_TTL, CLUSTER_CACHE_TTL) if CLUSTERED else CACHE_TTL)
+    write_behind = WRITE_BEHIND
+    writes = None
+
+    @staticmethod
+    async def open():
+        await Database.storage.open()
+        if Database.write_behind and Database.writes is None:
+            Database.writes = WriteBehindBuffer(
+                Database.storage,
+                interval=WRITE_BEHIND_INTERVAL,
+                max_pending=WRITE_BEHIND_MAX_PENDING,
+                on_flushed=Database._flushed,
+                chunk_size=BULK_CHUNK_SIZE,
+                max_attempts=WRITE_BEHIND_MAX_ATTEMPTS
+            )
+            Database.writes.start()
+
+    @staticmethod
+    async def close():
+        if Database.writes is not None:
+            writes, Database.writes = Database.writes, None
+            await writes.stop()
+            print(f"Write-behind buffer flushed: {writes.stats()}")
+        await Database.storage.close()
+
+    @staticmethod
+    def storage_stats():
+        return Database.storage.stats()
+
     @staticmethod
-    async def execute_query(endpoint, method="GET", json_data=None):
-        async with httpx.AsyncClient() as client:
-            try:
-                method = method.lower()
-                if method == "get":
-                    response = await client.get(f"{SUPABASE_URL}/{endpoint}", headers=HEADERS)
-                elif method == "post":
-                    response = await client.post(f"{SUPABASE_URL}/{endpoint}", headers=HEADERS, json=json_data)
-                elif method == "delete":
-                    response = await client.delete(f"{SUPABASE_URL}/{endpoint}", headers=HEADERS)
-                elif method == "patch":
-                    response = await client.patch(f"{SUPABASE_URL}/{endpoint}", headers=HEADERS, json=json_data)
-
-                if response.status_code == 204:
-                    return None
-                elif response.content:
-                    try:
-                        return response.json()
-                    except json.JSONDecodeError:
-                        return response.text
-                else:
-                    return None
-
-            except httpx.HTTPError as e:
-                print(f"HTTP error: {e}")
-                return None
-            except Exception as e:
-                print(f"Unexpected error in execute_query: {e}")
-                return None
+    def cache_stats():
+        return Database.cache.stats()
+
+    @staticmethod
+    def _flushed(table, user_ids):
+        key = "timezone" if table == "timezones" else table
+        for user_id in user_ids:
+            Database.cache.invalidate((key, int(user_id)))
+
+    @staticmethod
+    def _forget_row(table, row_id, user_id=None):
+        if user_id is not None:
+            Database.cache.invalidate((table, int(user_id)))
+        else:
+            Database.cache.invalidate_where(
+                lambda key, rows: key[0] == table and any(str(r.id) == str(row_id) for r in rows or [])
+            )
 
     @staticmethod
     async def get_user_timezone(user_id):
-        try:
-            data = await Database.execute_query(f"rest/v1/timezones?user_id=eq.{user_id}")
-            return data[0]["utc_offset"] if data else 0
-        except:
-            return 0
+        cached = Database.cache.get(("timezone", user_id), None)
+        if cached is not None:
+            return cached
+
+        data = await Database.storage.get_user_timezone(user_id)
+        offset = data[0]["utc_offset"] if data else 0
+        Database.cache.set(("timezone", user_id), offset)
+        return offset
 
     @staticmethod
     async def set_user_timezone(user_id, offset):
-        await Database.execute_query(
-            "rest/v1/timezones",
-            method="POST",
-            json_data={"user_id": user_id, "utc_offset": offset}
-        )
+        if Database.writes is not None:
+            Database.writes.set_user_timezone(user_id, offset)
+            Database.cache.set(("timezone", user_id), offset)
+            return
+
+        try:
+            await Database.storage.set_user_timezone(user_id, offset)
+        finally:
+            Database.cache.invalidate(("timezone", user_id))
+
+    @staticmethod
+    async def _get_page(table, record, user_id, cursor, backward, limit):
+        # Only the first page is cached, under the same (table, user_id) key
+        # the write paths already invalidate. One extra row is fetched to tell
+        # whether another page follows.
+        first = cursor is None and not backward
+        if first:
+            cached = Database.cache.get((table, user_id), None)
+            if cached is not None:
+                return cached[:limit], len(cached) > limit
+
+        fetch = Database.storage.get_tasks if table == "tasks" else Database.storage.get_reminders
+        rows = parse_rows(record, await fetch(user_id, cursor, backward, limit + 1))
+        if rows is None:
+            return None, False
+        if first:
+            Database.cache.set((table, user_id), rows)
+
+        page = rows[:limit]
+        if backward:
+            page.reverse()
+        return page, len(rows) > limit
+
+    @staticmethod
+    async def get_task_page(user_id, cursor=None, backward=False, limit=LIST_PAGE_SIZE):
+        return await Database._get_page("tasks", Task, user_id, cursor, backward, limit)
 
     @staticmethod
-    async def get_tasks(user_id):
-        return await Database.execute_query(f"rest/v1/tasks?user_id=eq.{user_id}")
+    async def search_tasks(user_id, query, limit=TASK_SEARCH_LIMIT):
+        # Storage narrows the candidates by priority; a few extra are fetched
+        # so closer matches within the same priority can still make the cut.
+        terms = search_terms(query)
+        if not terms:
+            return []
+        rows = await Database.storage.search_tasks(user_id, terms, min(limit * 3, 100))
+        return parse_rows(Task, rank(rows or [], terms, limit))
 
     @staticmethod
     async def add_task(user_id, task, priority):
-        await Database.execute_query(
-            "rest/v1/tasks",
-            method="POST",
-            json_data={"user_id": user_id, "task": task, "priority": priority}
-        )
+        if Database.writes is not None:
+            Database.writes.add_task({"user_id": user_id, "task": task, "priority": priority})
+            Database.cache.invalidate(("tasks", user_id))
+            return
+
+        try:
+            await Database.storage.add_task(user_id, task, priority)
+        finally:
+            Database.cache.invalidate(("tasks", user_id))
 
     @staticmethod
-    async def delete_task(task_id):
-        await Database.execute_query(f"rest/v1/tasks?id=eq.{task_id}", method="DELETE")
+    async def add_tasks(user_id, tasks):
+        # Imports skip the write-behind buffer; they are already one bulk write.
+        try:
+            await Database.storage.add_tasks([
+                {"user_id": user_id, "task": task, "priority": priority} for task, priority in tasks
+            ])
+        finally:
+            Database.cache.invalidate(("tasks", user_id))
 
     @staticmethod
-    async def get_reminders(user_id):
-        return await Database.execute_query(f"rest/v1/reminders?user_id=eq.{user_id}")
+    async def delete_tasks(task_ids, user_id=None):
+        task_ids = list(task_ids)
+        try:
+            await Database.storage.delete_tasks(task_ids)
+        finally:
+            if user_id is not None:
+                Database.cache.invalidate(("tasks", int(user_id)))
+            else:
+                for task_id in task_ids:
+                    Database._forget_row("tasks", task_id)
 
     @staticmethod
-    async def add_reminder(user_id, message, remind_at):
-        await Database.execute_query(
-            "rest/v1/reminders",
-            method="POST",
-            json_data={"user_id": user_id, "message": message, "remind_at": remind_at}
-        )
+    async def get_reminder_page(user_id, cursor=None, backward=False, limit=LIST_PAGE_SIZE):
+        if cursor is not None:
+            cursor = (to_utc_string(cursor[0]), cursor[1])
+        return await Database._get_page("reminders", Reminder, user_id, cursor, backward, limit)
 
     @staticmethod
-    async def delete_reminder(reminder_id):
-        await Database.execute_query(f"rest/v1/reminders?id=eq.{reminder_id}", method="DELETE")
+    async def get_reminder_overview(user_id, limit=LIST_PAGE_SIZE):
+        # The user's UTC offset and first reminder page. When neither is
+        # cached both come back from a single storage call; otherwise only the
+        # missing one is read.
+        if Database.cache.get(("timezone", user_id), None) is not None or Database.cache.get(("reminders", user_id), None) is not None:
+            return await asyncio.gather(
+                Database.get_user_timezone(user_id),
+                Database.get_reminder_page(user_id, limit=limit)
+            )
+
+        data = await Database.storage.get_reminder_overview(user_id, limit + 1)
+        offset = data["utc_offset"] or 0
+        rows = parse_rows(Reminder, data["reminders"])
+        Database.cache.set(("timezone", user_id), offset)
+        Database.cache.set(("reminders", user_id), rows)
+        return offset, (rows[:limit], len(rows) > limit)
+
+    @staticmethod
+    async def add_reminder(user_id, message, remind_at, on_saved=None, recurrence=None, utc_offset=0):
+        # on_saved receives the stored Reminder once it has an id, which with
+        # write-behind enabled is only after the next flush.
+        row = {"user_id": user_id, "message": message, "remind_at": remind_at}
+        if CLUSTERED:
+            row["bucket"] = user_bucket(user_id)
+        if recurrence:
+            row["recurrence"] = recurrence
+            row["utc_offset"] = utc_offset
+
+        if Database.writes is not None:
+            Database.writes.add_reminder(row, (lambda saved: on_saved(Reminder.from_row(saved))) if on_saved else None)
+            Database.cache.invalidate(("reminders", user_id))
+            return None
+
+        try:
+            data = await Database.storage.add_reminder(row)
+            reminder = Reminder.from_row(data[0]) if isinstance(data, list) and data else None
+            if reminder and on_saved:
+                on_saved(reminder)
+            return reminder
+        finally:
+            Database.cache.invalidate(("reminders", user_id))
+
+    @staticmethod
+    async def delete_reminders(reminder_ids, user_ids=None):
+        reminder_ids = list(reminder_ids)
+        try:
+            await Database.storage.delete_reminders(reminder_ids)
+        finally:
+            if user_ids is not None:
+                for user_id in set(user_ids):
+                    Database.cache.invalidate(("reminders", int(user_id)))
+            else:
+                for rid in reminder_ids:
+                    Database._forget_row("reminders", rid)
+
+    @staticmethod
+    async def reschedule_reminders(reminders):
+        # Moves existing rows to a new time and clears their claim; rows
+        # deleted in the meantime are not recreated.
+        rows = [{"id": r.id, "remind_at": to_utc_string(r.remind_at)} for r in reminders]
+
+        try:
+            await Database.storage.reschedule_reminders(rows)
+        finally:
+            for user_id in {r.user_id for r in reminders}:
+                Database.cache.invalidate(("reminders", user_id))
 
     @staticmethod
     async def get_due_reminders(start_time, end_time):
-        return await Database.execute_query(
-            f"rest/v1/reminders?remind_at=gt.{start_time}&remind_at=lte.{end_time}"
+        return parse_rows(Reminder, await Database.storage.get_due_reminders(start_time, end_time, bucket_filter()))
+
+    @staticmethod
+    async def claim_reminders(reminder_ids, owner=INSTANCE_ID, lease=REMINDER_LEASE):
+        now = datetime.now(timezone.utc)
+        data = await Database.storage.claim_reminders(
+            list(reminder_ids),
+            owner,
+            to_utc_string(now),
+            to_utc_string(now + timedelta(seconds=lease))
         )
+        return {int(row["id"]) for row in data}
 
     @staticmethod
     async def get_pomodoro_settings(user_id):
-        try:
-            data = await Database.execute_query(f"rest/v1/pomodoro_sessions?user_id=eq.{user_id}")
-            return data[0] if data else None
-        except:
-            return None
+        cached = Database.cache.get(("pomodoro_settings", user_id))
+        if cached is not _MISSING:
+            return cached
+
+        data = await Database.storage.get_pomodoro_settings(user_id)
+        settings = PomodoroSettings.from_row(data[0]) if data else None
+        Database.cache.set(("pomodoro_settings", user_id), settings)
+        return settings
 
     @staticmethod
     async def save_pomodoro_settings(user_id, work_duration, break_duration, long_break_duration, sessions_before_long_break):
-        await Database.execute_query(
-            "rest/v1/pomodoro_sessions",
-            method="POST",
-            json_data={
+        try:
+            await Database.storage.save_pomodoro_settings({
                 "user_id": user_id,
                 "work_duration": work_duration,
                 "break_duration": break_duration,
                 "long_break_duration": long_break_duration,
                 "sessions_before_long_break": sessions_before_long_break
-            }
-        )
+            })
+        finally:
+            Database.cache.invalidate(("pomodoro_settings", user_id))
+
+    @staticmethod
+    async def get_active_pomodoros():
+        return await Database.storage.get_active_pomodoros(bucket_filter())
+
+    @staticmethod
+    async def get_active_pomodoro(user_id):
+        data = await Database.storage.get_active_pomodoro(user_id)
+        return data[0] if data else None
+
+    @staticmethod
+    async def save_active_pomodoros(rows):
+        if CLUSTERED:
+            rows = [dict(row, bucket=user_bucket(row["user_id"])) for row in rows]
+        await Database.storage.save_active_pomodoros(rows)
+
+    @staticmethod
+    async def delete_active_pomodoros(user_ids):
+        await Database.storage.delete_active_pomodoros(list(user_ids))
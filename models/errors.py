@@ -0,0 +1,28 @@
+class StorageError(Exception):
+    pass
+
+# The backend could not be reached or answered with a transient failure
+# (timeout, 408, 429, 5xx). Worth retrying later.
+class StorageUnavailable(StorageError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+# Raised without touching the network while the circuit breaker is open.
+class CircuitOpen(StorageUnavailable):
+    def __init__(self, retry_in):
+        super().__init__(f"database temporarily unavailable, retrying in {retry_in:.0f}s", retry_after=retry_in)
+
+# The backend rejected the request itself, so retrying will not help.
+class StorageRequestError(StorageError):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+def describe(error):
+    # Short text for embeds; the full message is printed where it is caught.
+    if isinstance(error, CircuitOpen):
+        return str(error)
+    if isinstance(error, StorageUnavailable):
+        return "the database is not responding, please try again in a moment"
+    return str(error)
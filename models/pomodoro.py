@@ -1,5 +1,8 @@
 from enum import Enum
-import asyncio
+from datetime import datetime, timezone
+import math
+import time
+from utils.helpers import parse_utc_timestamp
 
 class PomodoroState(Enum):
     IDLE = 0
@@ -8,6 +11,27 @@ class PomodoroState(Enum):
     LONG_BREAK = 3
 
 class PomodoroSession:
+    __slots__ = (
+        "user_id",
+        "work_duration",
+        "break_duration",
+        "long_break_duration",
+        "sessions_before_long_break",
+        "state",
+        "phase_ends_at",
+        "phase_ends_at_wall",
+        "generation",
+        "completed_sessions",
+        "dirty",
+        "persisted",
+        "message",
+        "message_id",
+        "message_generation",
+        "last_render",
+        "edit_in_flight",
+        "edit_pending",
+    )
+
     def __init__(self, user_id, work_duration=25, break_duration=5, long_break_duration=15, sessions_before_long_break=4):
         self.user_id = user_id
         self.work_duration = work_duration
@@ -15,9 +39,109 @@ class PomodoroSession:
         self.long_break_duration = long_break_duration
         self.sessions_before_long_break = sessions_before_long_break
         self.state = PomodoroState.IDLE
-        self.remaining_time = 0
+        self.phase_ends_at = None
+        self.phase_ends_at_wall = None
+        self.generation = 0
         self.completed_sessions = 0
-        self.task = None
+        self.dirty = False
+        self.persisted = False
         self.message = None
+        self.message_id = None
+        self.message_generation = None
+        self.last_render = None
+        self.edit_in_flight = False
+        self.edit_pending = False
+
+    @classmethod
+    def from_settings(cls, user_id, settings):
+        return cls(
+            user_id=user_id,
+            work_duration=settings.work_duration,
+            break_duration=settings.break_duration,
+            long_break_duration=settings.long_break_duration,
+            sessions_before_long_break=settings.sessions_before_long_break
+        )
+
+    @property
+    def remaining_time(self):
+        if self.phase_ends_at is None:
+            return 0
+        return max(math.ceil(self.phase_ends_at - time.monotonic()), 0)
+
+    def phase_duration(self, state=None):
+        state = state or self.state
+        if state == PomodoroState.WORKING:
+            return self.work_duration * 60
+        elif state == PomodoroState.SHORT_BREAK:
+            return self.break_duration * 60
+        elif state == PomodoroState.LONG_BREAK:
+            return self.long_break_duration * 60
+        return 0
+
+    def start_phase(self, state, started_at=None):
+        wall_now = time.time()
+        started_at = wall_now if started_at is None else started_at
+        self.state = state
+        self.phase_ends_at_wall = started_at + self.phase_duration(state)
+        self.phase_ends_at = time.monotonic() + (self.phase_ends_at_wall - wall_now)
+        self.generation += 1
+        self.dirty = True
+
+    def advance(self, started_at=None):
+        previous = self.state
+        if previous == PomodoroState.WORKING:
+            self.completed_sessions += 1
+            if self.completed_sessions >= self.sessions_before_long_break:
+                self.start_phase(PomodoroState.LONG_BREAK, started_at)
+            else:
+                self.start_phase(PomodoroState.SHORT_BREAK, started_at)
+        else:
+            self.start_phase(PomodoroState.WORKING, started_at)
+        return previous
+
+    def catch_up(self, now=None, max_phases=10000):
+        now = time.time() if now is None else now
+        phases = 0
+        while self.phase_ends_at_wall <= now and phases < max_phases:
+            self.advance(started_at=self.phase_ends_at_wall)
+            phases += 1
+        return phases
+
+    def stop(self):
+        self.state = PomodoroState.IDLE
+        self.phase_ends_at = None
+        self.phase_ends_at_wall = None
+        self.generation += 1
+
+    def to_row(self):
+        return {
+            "user_id": self.user_id,
+            "state": self.state.name,
+            "phase_ends_at": datetime.fromtimestamp(self.phase_ends_at_wall, timezone.utc).isoformat(),
+            "completed_sessions": self.completed_sessions,
+            "work_duration": self.work_duration,
+            "break_duration": self.break_duration,
+            "long_break_duration": self.long_break_duration,
+            "sessions_before_long_break": self.sessions_before_long_break,
+            "message_id": self.message_id
+        }
+
+    @classmethod
+    def from_row(cls, row):
+        session = cls(
+            user_id=int(row["user_id"]),
+            work_duration=row["work_duration"],
+            break_duration=row["break_duration"],
+            long_break_duration=row["long_break_duration"],
+            sessions_before_long_break=row["sessions_before_long_break"]
+        )
+        session.completed_sessions = row.get("completed_sessions") or 0
+        session.message_id = int(row["message_id"]) if row.get("message_id") else None
+        state = PomodoroState[row["state"]]
+        ends_at = parse_utc_timestamp(row["phase_ends_at"]).timestamp()
+        session.start_phase(state, started_at=ends_at - session.phase_duration(state))
+        session.dirty = False
+        session.persisted = True
+        return session
 
 active_pomodoro_sessions = {}
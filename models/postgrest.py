@@ -0,0 +1,342 @@
+import asyncio
+import itertools
+import json
+import time
+from urllib.parse import quote
+import httpx
+from config import (
+    SUPABASE_URL,
+    HEADERS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_TIMEOUT,
+    HTTP2,
+    BULK_CHUNK_SIZE,
+    DB_RETRIES,
+    DB_RETRY_BASE,
+    DB_RETRY_MAX,
+    BREAKER_THRESHOLD,
+    BREAKER_RESET,
+    HEDGE_AFTER,
+    OVERVIEW_RPC,
+    TASK_SEARCH,
+)
+from models.errors import StorageUnavailable, StorageRequestError, CircuitOpen
+from models.storage import Storage
+from utils.metrics import DB_REQUEST_SECONDS, DB_ERRORS, DB_RETRIED
+from utils.resilience import CircuitBreaker, backoff, hedged
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE"}
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+def bucket_range(buckets):
+    return f"&bucket=gte.{buckets[0]}&bucket=lt.{buckets[1]}" if buckets else ""
+
+def retry_after(response):
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+def chunked(items, size=BULK_CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class PostgrestStorage(Storage):
+    def __init__(self, base_url=SUPABASE_URL, headers=HEADERS):
+        self.base_url = base_url
+        self.headers = headers
+        self.client = None
+        self.retries = DB_RETRIES
+        self.hedge_after = HEDGE_AFTER
+        self.overview_rpc = OVERVIEW_RPC
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET)
+        self.counters = {"requests": 0, "connections_opened": 0, "http2_requests": 0, "retries": 0, "hedged": 0}
+
+    async def open(self):
+        if self.client is not None:
+            return
+
+        http2 = HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT)
+        )
+
+    async def close(self):
+        if self.client is None:
+            return
+
+        client, self.client = self.client, None
+        await client.aclose()
+        print(f"HTTP client closed: {self.stats()}")
+
+    def stats(self):
+        requests = self.counters["requests"]
+        opened = self.counters["connections_opened"]
+        reused = max(requests - opened, 0)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "reused_requests": reused,
+            "reuse_ratio": round(reused / requests, 3) if requests else 0.0,
+            "http2_requests": self.counters["http2_requests"],
+            "retries": self.counters["retries"],
+            "hedged": self.counters["hedged"],
+            "breaker": self.breaker.state,
+            "breaker_rejected": self.breaker.counters["rejected"]
+        }
+
+    async def _trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            self.counters["connections_opened"] += 1
+
+    async def execute_query(self, endpoint, method="GET", json_data=None, timeout=None, headers=None, idempotent=None):
+        # Raises StorageUnavailable (after retries, or at once while the
+        # circuit is open) and StorageRequestError; only idempotent requests
+        # are retried, since a timed-out insert may already have landed.
+        if self.client is None:
+            await self.open()
+
+        kwargs = {"extensions": {"trace": self._trace}}
+        if json_data is not None:
+            kwargs["json"] = json_data
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if headers:
+            kwargs["headers"] = headers
+
+        method = method.upper()
+        path = endpoint.split("?", 1)[0]
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                DB_ERRORS.inc(path, method, "CircuitOpen")
+                raise CircuitOpen(self.breaker.retry_in())
+            try:
+                result = await self._request(method, endpoint, path, kwargs)
+            except StorageUnavailable as e:
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts or self.breaker.state != "closed":
+                    raise
+                delay = e.retry_after if e.retry_after is not None else backoff(attempt, DB_RETRY_BASE, DB_RETRY_MAX)
+                delay = min(delay, DB_RETRY_MAX)
+                self.counters["retries"] += 1
+                DB_RETRIED.inc(path, method)
+                print(f"{e}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except StorageRequestError:
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _request(self, method, endpoint, path, kwargs):
+        url = f"{self.base_url}/{endpoint}"
+        started = time.perf_counter()
+        try:
+            if method == "GET" and self.hedge_after > 0:
+                response, hedged_request = await hedged(lambda: self.client.request(method, url, **kwargs), self.hedge_after)
+                if hedged_request:
+                    self.counters["hedged"] += 1
+            else:
+                response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            DB_ERRORS.inc(path, method, type(e).__name__)
+            raise StorageUnavailable(f"{method} {path} failed: {type(e).__name__} {e}") from e
+
+        DB_REQUEST_SECONDS.observe(time.perf_counter() - started, path, method)
+        self.counters["requests"] += 1
+        if response.http_version == "HTTP/2":
+            self.counters["http2_requests"] += 1
+
+        status = response.status_code
+        if status >= 400:
+            DB_ERRORS.inc(path, method, str(status))
+            message = f"{method} {path} returned {status}: {response.text[:200]}"
+            if status in RETRYABLE_STATUSES:
+                raise StorageUnavailable(message, retry_after=retry_after(response))
+            raise StorageRequestError(message, status)
+
+        if status == 204 or not response.content:
+            return None
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            return response.text
+
+    async def get_user_timezone(self, user_id):
+        return await self.execute_query(f"rest/v1/timezones?user_id=eq.{user_id}")
+
+    async def set_user_timezone(self, user_id, offset):
+        await self.execute_query(
+            "rest/v1/timezones",
+            method="POST",
+            json_data={"user_id": user_id, "utc_offset": offset},
+            idempotent=True
+        )
+
+    async def set_user_timezones(self, rows):
+        for chunk in chunked(rows):
+            await self.execute_query("rest/v1/timezones", method="POST", json_data=chunk, idempotent=True)
+
+    async def get_tasks(self, user_id, cursor=None, backward=False, limit=None):
+        direction, op = ("desc", "lt") if backward else ("asc", "gt")
+        query = f"rest/v1/tasks?user_id=eq.{user_id}&order=id.{direction}"
+        if cursor is not None:
+            query += f"&id={op}.{cursor}"
+        if limit:
+            query += f"&limit={limit}"
+        return await self.execute_query(query)
+
+    async def add_task(self, user_id, task, priority):
+        await self.execute_query(
+            "rest/v1/tasks",
+            method="POST",
+            json_data={"user_id": user_id, "task": task, "priority": priority}
+        )
+
+    async def add_tasks(self, rows):
+        for chunk in chunked(rows):
+            await self.execute_query("rest/v1/tasks", method="POST", json_data=chunk)
+
+    async def search_tasks(self, user_id, terms, limit):
+        if TASK_SEARCH == "fts":
+            match = f"&task=wfts.{quote(' '.join(terms))}"
+        else:
+            match = "".join(f"&task=ilike.*{quote(term)}*" for term in terms)
+        return await self.execute_query(
+            f"rest/v1/tasks?user_id=eq.{user_id}{match}&order=priority.asc,id.asc&limit={limit}"
+        )
+
+    async def delete_tasks(self, task_ids):
+        for chunk in chunked(task_ids):
+            ids = ",".join(str(tid) for tid in chunk)
+            await self.execute_query(f"rest/v1/tasks?id=in.({ids})", method="DELETE")
+
+    async def get_reminders(self, user_id, cursor=None, backward=False, limit=None):
+        direction, op = ("desc", "lt") if backward else ("asc", "gt")
+        query = f"rest/v1/reminders?user_id=eq.{user_id}&order=remind_at.{direction},id.{direction}"
+        if cursor is not None:
+            remind_at, rid = cursor
+            query += f"&or=(remind_at.{op}.{remind_at},and(remind_at.eq.{remind_at},id.{op}.{rid}))"
+        if limit:
+            query += f"&limit={limit}"
+        return await self.execute_query(query)
+
+    async def get_reminder_overview(self, user_id, limit):
+        if self.overview_rpc:
+            try:
+                data = await self.execute_query(f"rest/v1/rpc/reminder_overview?p_user_id={user_id}&p_limit={limit}")
+            except StorageRequestError as e:
+                if e.status != 404:
+                    raise
+                if self.overview_rpc:
+                    print(f"reminder_overview function not found, reading timezone and reminders separately: {e}")
+                    self.overview_rpc = False
+            else:
+                return {"utc_offset": data.get("utc_offset"), "reminders": data.get("reminders") or []}
+        return await super().get_reminder_overview(user_id, limit)
+
+    async def add_reminder(self, row):
+        return await self.execute_query(
+            "rest/v1/reminders",
+            method="POST",
+            json_data=row,
+            headers={"Prefer": "resolution=merge-duplicates,return=representation"}
+        )
+
+    async def add_reminders(self, rows):
+        # A bulk insert needs the same keys in every object, so one-off and
+        # recurring reminders go out in separate runs, keeping their order.
+        saved = []
+        for _, run in itertools.groupby(rows, key=lambda row: tuple(sorted(row))):
+            for chunk in chunked(run):
+                data = await self.execute_query(
+                    "rest/v1/reminders",
+                    method="POST",
+                    json_data=chunk,
+                    headers={"Prefer": "return=representation"}
+                )
+                saved.extend(data or [])
+        return saved
+
+    async def delete_reminders(self, reminder_ids):
+        for chunk in chunked(reminder_ids):
+            ids = ",".join(str(rid) for rid in chunk)
+            await self.execute_query(f"rest/v1/reminders?id=in.({ids})", method="DELETE")
+
+    async def reschedule_reminders(self, rows):
+        # A PATCH only touches rows that still exist, so a reminder deleted
+        # while it was firing stays deleted. Reminders sharing a rule move to
+        # the same time and go out together.
+        by_time = {}
+        for row in rows:
+            by_time.setdefault(row["remind_at"], []).append(row["id"])
+        for remind_at, reminder_ids in by_time.items():
+            for chunk in chunked(reminder_ids):
+                ids = ",".join(str(rid) for rid in chunk)
+                await self.execute_query(
+                    f"rest/v1/reminders?id=in.({ids})",
+                    method="PATCH",
+                    json_data={"remind_at": remind_at, "claimed_by": None, "claimed_until": None}
+                )
+
+    async def get_due_reminders(self, start_time, end_time, buckets=None):
+        return await self.execute_query(
+            f"rest/v1/reminders?remind_at=gt.{start_time}&remind_at=lte.{end_time}{bucket_range(buckets)}"
+        )
+
+    async def claim_reminders(self, reminder_ids, owner, now, lease_until):
+        claimed = []
+        for chunk in chunked(reminder_ids):
+            ids = ",".join(str(rid) for rid in chunk)
+            data = await self.execute_query(
+                f"rest/v1/reminders?id=in.({ids})"
+                f'&or=(claimed_until.is.null,claimed_until.lt.{now},claimed_by.eq."{owner}")',
+                method="PATCH",
+                json_data={"claimed_by": owner, "claimed_until": lease_until},
+                headers={"Prefer": "return=representation"}
+            )
+            claimed.extend(data or [])
+        return claimed
+
+    async def get_pomodoro_settings(self, user_id):
+        return await self.execute_query(f"rest/v1/pomodoro_sessions?user_id=eq.{user_id}")
+
+    async def save_pomodoro_settings(self, row):
+        await self.execute_query("rest/v1/pomodoro_sessions", method="POST", json_data=row, idempotent=True)
+
+    async def get_active_pomodoros(self, buckets=None):
+        return await self.execute_query(f"rest/v1/active_pomodoros?select=*{bucket_range(buckets)}")
+
+    async def get_active_pomodoro(self, user_id):
+        return await self.execute_query(f"rest/v1/active_pomodoros?user_id=eq.{user_id}")
+
+    async def save_active_pomodoros(self, rows):
+        for chunk in chunked(rows):
+            await self.execute_query("rest/v1/active_pomodoros", method="POST", json_data=chunk, idempotent=True)
+
+    async def delete_active_pomodoros(self, user_ids):
+        for chunk in chunked(user_ids):
+            ids = ",".join(str(user_id) for user_id in chunk)
+            await self.execute_query(f"rest/v1/active_pomodoros?user_id=in.({ids})", method="DELETE")
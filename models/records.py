@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from datetime import datetime
+from utils.helpers import parse_utc_timestamp
+
+@dataclass(slots=True)
+class Task:
+    id: int
+    user_id: int
+    task: str
+    priority: int
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            id=int(row["id"]),
+            user_id=int(row["user_id"]),
+            task=row["task"],
+            priority=int(row["priority"])
+        )
+
+@dataclass(slots=True)
+class Reminder:
+    id: int
+    user_id: int
+    message: str
+    remind_at: datetime
+    recurrence: str | None = None
+    utc_offset: int = 0
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            id=int(row["id"]),
+            user_id=int(row["user_id"]),
+            message=row["message"],
+            remind_at=parse_utc_timestamp(row["remind_at"]),
+            recurrence=row.get("recurrence"),
+            utc_offset=int(row.get("utc_offset") or 0)
+        )
+
+@dataclass(slots=True, frozen=True)
+class PomodoroSettings:
+    work_duration: int = 25
+    break_duration: int = 5
+    long_break_duration: int = 15
+    sessions_before_long_break: int = 4
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            work_duration=int(row["work_duration"]),
+            break_duration=int(row["break_duration"]),
+            long_break_duration=int(row["long_break_duration"]),
+            sessions_before_long_break=int(row["sessions_before_long_break"])
+        )
+
+def parse_rows(record, data):
+    if not isinstance(data, list):
+        return None
+    return [record.from_row(row) for row in data]
@@ -0,0 +1,350 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from models.errors import StorageUnavailable, StorageRequestError
+from models.storage import Storage
+from utils.helpers import parse_utc_timestamp, to_utc_string
+from config import OWNERSHIP_BUCKETS
+from utils.search import TrigramIndex, matches, rank
+from utils.sharding import user_bucket
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS timezones (
+    user_id INTEGER PRIMARY KEY,
+    utc_offset INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    priority INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    remind_at TEXT NOT NULL,
+    bucket INTEGER,
+    claimed_by TEXT,
+    claimed_until TEXT,
+    recurrence TEXT,
+    utc_offset INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS pomodoro_sessions (
+    user_id INTEGER PRIMARY KEY,
+    work_duration INTEGER NOT NULL,
+    break_duration INTEGER NOT NULL,
+    long_break_duration INTEGER NOT NULL,
+    sessions_before_long_break INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS active_pomodoros (
+    user_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    phase_ends_at TEXT NOT NULL,
+    completed_sessions INTEGER NOT NULL,
+    work_duration INTEGER NOT NULL,
+    break_duration INTEGER NOT NULL,
+    long_break_duration INTEGER NOT NULL,
+    sessions_before_long_break INTEGER NOT NULL,
+    message_id INTEGER,
+    bucket INTEGER
+);
+"""
+
+COLUMNS = {
+    "reminders": {
+        "bucket": "INTEGER",
+        "claimed_by": "TEXT",
+        "claimed_until": "TEXT",
+        "recurrence": "TEXT",
+        "utc_offset": "INTEGER",
+    },
+    "active_pomodoros": {"bucket": "INTEGER"},
+}
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS tasks_user_id ON tasks (user_id);
+CREATE INDEX IF NOT EXISTS reminders_user_id ON reminders (user_id);
+CREATE INDEX IF NOT EXISTS reminders_remind_at ON reminders (remind_at);
+CREATE INDEX IF NOT EXISTS active_pomodoros_bucket ON active_pomodoros (bucket);
+"""
+
+ACTIVE_POMODORO_COLUMNS = (
+    "user_id",
+    "state",
+    "phase_ends_at",
+    "completed_sessions",
+    "work_duration",
+    "break_duration",
+    "long_break_duration",
+    "sessions_before_long_break",
+    "message_id",
+    "bucket",
+)
+
+def bucket_clause(buckets):
+    return (" AND bucket >= ? AND bucket < ?", tuple(buckets)) if buckets else ("", ())
+
+class SQLiteStorage(Storage):
+    def __init__(self, path="taskforce.db"):
+        self.path = path
+        self.conn = None
+        self.executor = None
+        self.search_index = TrigramIndex()
+        self.counters = {"queries": 0, "writes": 0}
+
+    async def _run(self, fn, *args):
+        if self.executor is None:
+            await self.open()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        except sqlite3.OperationalError as e:
+            # Locked or busy database files and disk errors.
+            raise StorageUnavailable(f"SQLite: {e}") from e
+        except sqlite3.Error as e:
+            raise StorageRequestError(f"SQLite: {e}") from e
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(TABLES)
+        for table, columns in COLUMNS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, declaration in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+        with conn:
+            for table in ("reminders", "active_pomodoros"):
+                conn.execute(f"UPDATE {table} SET bucket = user_id % ? WHERE bucket IS NULL", (OWNERSHIP_BUCKETS,))
+        conn.executescript(INDEXES)
+        return conn
+
+    def _insert(self, sql, rows):
+        self.counters["writes"] += 1
+        with self.conn:
+            return [self.conn.execute(sql, row).lastrowid for row in rows]
+
+    def _query(self, sql, params=()):
+        self.counters["queries"] += 1
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _write(self, sql, params=(), many=False):
+        self.counters["writes"] += 1
+        with self.conn:
+            if many:
+                self.conn.executemany(sql, params)
+                return None
+            cursor = self.conn.execute(sql, params)
+            return cursor.lastrowid
+
+    async def open(self):
+        if self.executor is not None:
+            return
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.conn = await asyncio.get_running_loop().run_in_executor(self.executor, self._connect)
+
+    async def close(self):
+        if self.executor is None:
+            return
+
+        executor, self.executor = self.executor, None
+        await asyncio.get_running_loop().run_in_executor(executor, self.conn.close)
+        executor.shutdown(wait=True)
+        self.conn = None
+        print(f"SQLite storage closed: {self.stats()}")
+
+    def stats(self):
+        return dict(self.counters, path=self.path)
+
+    async def get_user_timezone(self, user_id):
+        return await self._run(self._query, "SELECT * FROM timezones WHERE user_id = ?", (user_id,))
+
+    async def set_user_timezone(self, user_id, offset):
+        await self.set_user_timezones([{"user_id": user_id, "utc_offset": offset}])
+
+    async def set_user_timezones(self, rows):
+        await self._run(
+            self._write,
+            "INSERT INTO timezones (user_id, utc_offset) VALUES (:user_id, :utc_offset) "
+            "ON CONFLICT (user_id) DO UPDATE SET utc_offset = excluded.utc_offset",
+            rows,
+            True
+        )
+
+    async def get_tasks(self, user_id, cursor=None, backward=False, limit=None):
+        direction, op = ("DESC", "<") if backward else ("ASC", ">")
+        sql, params = "SELECT * FROM tasks WHERE user_id = ?", [user_id]
+        if cursor is not None:
+            sql += f" AND id {op} ?"
+            params.append(int(cursor))
+        sql += f" ORDER BY id {direction}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return await self._run(self._query, sql, tuple(params))
+
+    async def add_task(self, user_id, task, priority):
+        task_id = await self._run(
+            self._write,
+            "INSERT INTO tasks (user_id, task, priority) VALUES (?, ?, ?)",
+            (user_id, task, priority)
+        )
+        self.search_index.add(user_id, {"id": task_id, "user_id": user_id, "task": task, "priority": priority})
+
+    async def add_tasks(self, rows):
+        await self._run(
+            self._write,
+            "INSERT INTO tasks (user_id, task, priority) VALUES (:user_id, :task, :priority)",
+            rows,
+            True
+        )
+        for user_id in {row["user_id"] for row in rows}:
+            self.search_index.forget(user_id)
+
+    async def delete_tasks(self, task_ids):
+        await self._run(self._write, "DELETE FROM tasks WHERE id = ?", [(int(tid),) for tid in task_ids], True)
+        for task_id in task_ids:
+            self.search_index.discard(task_id)
+
+    async def search_tasks(self, user_id, terms, limit):
+        index = self.search_index
+        if user_id not in index:
+            generation = index.generation
+            rows = await self._run(self._query, "SELECT * FROM tasks WHERE user_id = ?", (user_id,))
+            if not index.build(user_id, rows, generation):
+                return rank([row for row in rows if matches(row["task"], terms)], terms, limit)
+        return index.search(user_id, terms, limit)
+
+    def _overview(self, user_id, limit):
+        timezone = self._query("SELECT utc_offset FROM timezones WHERE user_id = ?", (user_id,))
+        reminders = self._query(
+            "SELECT * FROM reminders WHERE user_id = ? ORDER BY remind_at ASC, id ASC LIMIT ?",
+            (user_id, limit)
+        )
+        return {"utc_offset": timezone[0]["utc_offset"] if timezone else None, "reminders": reminders}
+
+    async def get_reminder_overview(self, user_id, limit):
+        return await self._run(self._overview, user_id, limit)
+
+    async def get_reminders(self, user_id, cursor=None, backward=False, limit=None):
+        direction, op = ("DESC", "<") if backward else ("ASC", ">")
+        sql, params = "SELECT * FROM reminders WHERE user_id = ?", [user_id]
+        if cursor is not None:
+            sql += f" AND (remind_at, id) {op} (?, ?)"
+            params.extend((cursor[0], int(cursor[1])))
+        sql += f" ORDER BY remind_at {direction}, id {direction}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return await self._run(self._query, sql, tuple(params))
+
+    async def add_reminder(self, row):
+        return await self.add_reminders([row])
+
+    async def add_reminders(self, rows):
+        rows = [
+            {
+                "user_id": row["user_id"],
+                "message": row["message"],
+                "remind_at": to_utc_string(parse_utc_timestamp(row["remind_at"])),
+                "bucket": user_bucket(row["user_id"]),
+                "recurrence": row.get("recurrence"),
+                "utc_offset": row.get("utc_offset"),
+            }
+            for row in rows
+        ]
+        ids = await self._run(
+            self._insert,
+            "INSERT INTO reminders (user_id, message, remind_at, bucket, recurrence, utc_offset) "
+            "VALUES (:user_id, :message, :remind_at, :bucket, :recurrence, :utc_offset)",
+            rows
+        )
+        return [dict(row, id=rid) for row, rid in zip(rows, ids)]
+
+    async def reschedule_reminders(self, rows):
+        await self._run(
+            self._write,
+            "UPDATE reminders SET remind_at = ?, claimed_by = NULL, claimed_until = NULL WHERE id = ?",
+            [(to_utc_string(parse_utc_timestamp(row["remind_at"])), int(row["id"])) for row in rows],
+            True
+        )
+
+    async def delete_reminders(self, reminder_ids):
+        await self._run(self._write, "DELETE FROM reminders WHERE id = ?", [(int(rid),) for rid in reminder_ids], True)
+
+    async def get_due_reminders(self, start_time, end_time, buckets=None):
+        clause, params = bucket_clause(buckets)
+        return await self._run(
+            self._query,
+            f"SELECT * FROM reminders WHERE remind_at > ? AND remind_at <= ?{clause} ORDER BY remind_at",
+            (start_time, end_time) + params
+        )
+
+    def _claim(self, reminder_ids, owner, now, lease_until):
+        self.counters["writes"] += 1
+        placeholders = ", ".join("?" for _ in reminder_ids)
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE reminders SET claimed_by = ?, claimed_until = ? WHERE id IN ({placeholders}) "
+                "AND (claimed_until IS NULL OR claimed_until < ? OR claimed_by = ?)",
+                (owner, lease_until, *reminder_ids, now, owner)
+            )
+            return [dict(row) for row in self.conn.execute(
+                f"SELECT * FROM reminders WHERE id IN ({placeholders}) AND claimed_by = ? AND claimed_until = ?",
+                (*reminder_ids, owner, lease_until)
+            )]
+
+    async def claim_reminders(self, reminder_ids, owner, now, lease_until):
+        reminder_ids = [int(rid) for rid in reminder_ids]
+        if not reminder_ids:
+            return []
+        return await self._run(self._claim, reminder_ids, owner, now, lease_until)
+
+    async def get_pomodoro_settings(self, user_id):
+        return await self._run(self._query, "SELECT * FROM pomodoro_sessions WHERE user_id = ?", (user_id,))
+
+    async def save_pomodoro_settings(self, row):
+        await self._run(
+            self._write,
+            "INSERT OR REPLACE INTO pomodoro_sessions "
+            "(user_id, work_duration, break_duration, long_break_duration, sessions_before_long_break) "
+            "VALUES (:user_id, :work_duration, :break_duration, :long_break_duration, :sessions_before_long_break)",
+            row
+        )
+
+    async def get_active_pomodoros(self, buckets=None):
+        if buckets:
+            return await self._run(
+                self._query,
+                "SELECT * FROM active_pomodoros WHERE bucket >= ? AND bucket < ?",
+                tuple(buckets)
+            )
+        return await self._run(self._query, "SELECT * FROM active_pomodoros")
+
+    async def get_active_pomodoro(self, user_id):
+        return await self._run(self._query, "SELECT * FROM active_pomodoros WHERE user_id = ?", (user_id,))
+
+    async def save_active_pomodoros(self, rows):
+        columns = ", ".join(ACTIVE_POMODORO_COLUMNS)
+        values = ", ".join(f":{column}" for column in ACTIVE_POMODORO_COLUMNS)
+        await self._run(
+            self._write,
+            f"INSERT OR REPLACE INTO active_pomodoros ({columns}) VALUES ({values})",
+            [dict(row, bucket=user_bucket(row["user_id"]), message_id=row.get("message_id")) for row in rows],
+            True
+        )
+
+    async def delete_active_pomodoros(self, user_ids):
+        await self._run(
+            self._write,
+            "DELETE FROM active_pomodoros WHERE user_id = ?",
+            [(int(user_id),) for user_id in user_ids],
+            True
+        )
@@ -0,0 +1,93 @@
+import asyncio
+
+class Storage:
+    # Backends return raw rows (lists of dicts) and raise the StorageError
+    # types from models.errors when a call fails; Database parses, caches and
+    # invalidates on top of them.
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {}
+
+    async def get_user_timezone(self, user_id):
+        raise NotImplementedError
+
+    async def set_user_timezone(self, user_id, offset):
+        raise NotImplementedError
+
+    async def set_user_timezones(self, rows):
+        raise NotImplementedError
+
+    # Listings are keyset-paginated: cursor is the sort key of the last row
+    # seen (task id, or (remind_at, id) for reminders) and backward=True
+    # returns the rows before it in descending order.
+    async def get_tasks(self, user_id, cursor=None, backward=False, limit=None):
+        raise NotImplementedError
+
+    async def add_task(self, user_id, task, priority):
+        raise NotImplementedError
+
+    async def add_tasks(self, rows):
+        raise NotImplementedError
+
+    async def delete_tasks(self, task_ids):
+        raise NotImplementedError
+
+    # Tasks whose text contains every search term (lowercase words), best
+    # candidates first, at most limit rows; Database ranks the result.
+    async def search_tasks(self, user_id, terms, limit):
+        raise NotImplementedError
+
+    async def get_reminders(self, user_id, cursor=None, backward=False, limit=None):
+        raise NotImplementedError
+
+    # The user's timezone row and first page of reminders together, as
+    # {"utc_offset": int | None, "reminders": rows}. Backends that can answer
+    # in one round trip override this; the fallback issues both reads at once.
+    async def get_reminder_overview(self, user_id, limit):
+        timezone, reminders = await asyncio.gather(
+            self.get_user_timezone(user_id),
+            self.get_reminders(user_id, limit=limit)
+        )
+        return {"utc_offset": timezone[0]["utc_offset"] if timezone else None, "reminders": reminders}
+
+    async def add_reminder(self, row):
+        raise NotImplementedError
+
+    async def add_reminders(self, rows):
+        raise NotImplementedError
+
+    async def delete_reminders(self, reminder_ids):
+        raise NotImplementedError
+
+    async def reschedule_reminders(self, rows):
+        raise NotImplementedError
+
+    async def get_due_reminders(self, start_time, end_time, buckets=None):
+        raise NotImplementedError
+
+    async def claim_reminders(self, reminder_ids, owner, now, lease_until):
+        raise NotImplementedError
+
+    async def get_pomodoro_settings(self, user_id):
+        raise NotImplementedError
+
+    async def save_pomodoro_settings(self, row):
+        raise NotImplementedError
+
+    async def get_active_pomodoros(self, buckets=None):
+        raise NotImplementedError
+
+    async def get_active_pomodoro(self, user_id):
+        raise NotImplementedError
+
+    async def save_active_pomodoros(self, rows):
+        raise NotImplementedError
+
+    async def delete_active_pomodoros(self, user_ids):
+        raise NotImplementedError
@@ -0,0 +1,173 @@
+import asyncio
+from models.errors import StorageRequestError
+
+class WriteBehindBuffer:
+    # Queues acknowledged writes and stores them as bulk requests every
+    # interval seconds, or as soon as max_pending writes are waiting. Repeated
+    # timezone upserts for the same user collapse into the latest value.
+    # Inserts go out chunk_size rows per request; a chunk that fails is put
+    # back in front of newer writes, together with the chunks not yet sent,
+    # unless storage rejected the rows themselves. A failed insert may still
+    # have landed, so a chunk is given up after max_attempts tries.
+    def __init__(self, storage, interval=0.5, max_pending=200, on_flushed=None, chunk_size=200, max_attempts=3):
+        self.storage = storage
+        self.interval = interval
+        self.max_pending = max_pending
+        self.on_flushed = on_flushed
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.timezones = {}
+        self.tasks = []
+        self.reminders = []
+        self.counters = {"queued": 0, "merged": 0, "flushes": 0, "rows": 0, "failures": 0, "dropped": 0}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._runner = None
+
+    def __len__(self):
+        return len(self.timezones) + len(self.tasks) + len(self.reminders)
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._closing = False
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._closing = True
+        self._wakeup.set()
+        if self._runner:
+            runner, self._runner = self._runner, None
+            await runner
+        else:
+            await self.close()
+
+    async def close(self):
+        # Last flush on shutdown; whatever still fails is lost.
+        await self.flush()
+        if len(self):
+            print(f"Write-behind buffer stopped with {len(self)} unsaved writes, dropping them")
+            self.counters["dropped"] += len(self)
+            self.timezones, self.tasks, self.reminders = {}, [], []
+
+    def stats(self):
+        return dict(self.counters, pending=len(self))
+
+    def _queued(self):
+        self.counters["queued"] += 1
+        if len(self) >= self.max_pending:
+            self._wakeup.set()
+
+    def set_user_timezone(self, user_id, offset):
+        if user_id in self.timezones:
+            self.counters["merged"] += 1
+        self.timezones[user_id] = offset
+        self._queued()
+
+    def add_task(self, row):
+        self.tasks.append((row, 0))
+        self._queued()
+
+    def add_reminder(self, row, on_saved=None):
+        self.reminders.append((row, on_saved, 0))
+        self._queued()
+
+    def _done(self, table, rows):
+        self.counters["rows"] += len(rows)
+        if self.on_flushed:
+            self.on_flushed(table, {row["user_id"] for row in rows})
+
+    async def _flush_timezones(self, timezones):
+        rows = [{"user_id": user_id, "utc_offset": offset} for user_id, offset in timezones.items()]
+        try:
+            await self.storage.set_user_timezones(rows)
+        except StorageRequestError as e:
+            print(f"Dropping {len(rows)} timezones rejected by storage: {e}")
+            self.counters["dropped"] += len(rows)
+            return
+        except Exception as e:
+            print(f"Failed to flush {len(rows)} timezones: {e}")
+            self.counters["failures"] += 1
+            for user_id, offset in timezones.items():
+                self.timezones.setdefault(user_id, offset)
+            return
+        self._done("timezones", rows)
+
+    def _chunks(self, entries):
+        for i in range(0, len(entries), self.chunk_size):
+            yield entries[i:i + self.chunk_size], entries[i + self.chunk_size:]
+
+    def _requeue(self, queue, table, chunk, rest):
+        # The failed chunk counts an attempt; the chunks after it were never
+        # sent and keep theirs.
+        retry = [entry[:-1] + (entry[-1] + 1,) for entry in chunk]
+        given_up = [entry for entry in retry if entry[-1] >= self.max_attempts]
+        if given_up:
+            print(f"Giving up on {len(given_up)} {table} after {self.max_attempts} attempts")
+            self.counters["dropped"] += len(given_up)
+        queue[:0] = [entry for entry in retry if entry[-1] < self.max_attempts] + rest
+
+    async def _flush_tasks(self, tasks):
+        for chunk, rest in self._chunks(tasks):
+            rows = [row for row, _ in chunk]
+            try:
+                await self.storage.add_tasks(rows)
+            except StorageRequestError as e:
+                print(f"Dropping {len(rows)} tasks rejected by storage: {e}")
+                self.counters["dropped"] += len(rows)
+                continue
+            except Exception as e:
+                print(f"Failed to flush {len(rows)} tasks: {e}")
+                self.counters["failures"] += 1
+                self._requeue(self.tasks, "tasks", chunk, rest)
+                return
+            self._done("tasks", rows)
+
+    async def _flush_reminders(self, reminders):
+        for chunk, rest in self._chunks(reminders):
+            rows = [row for row, _, _ in chunk]
+            try:
+                saved = await self.storage.add_reminders(rows)
+            except StorageRequestError as e:
+                print(f"Dropping {len(rows)} reminders rejected by storage: {e}")
+                self.counters["dropped"] += len(rows)
+                continue
+            except Exception as e:
+                print(f"Failed to flush {len(rows)} reminders: {e}")
+                self.counters["failures"] += 1
+                self._requeue(self.reminders, "reminders", chunk, rest)
+                return
+            self._done("reminders", rows)
+
+            # Bulk inserts return rows in request order, which is how the new
+            # ids are matched back to whoever is waiting for them.
+            if isinstance(saved, list) and len(saved) == len(chunk):
+                for (_, on_saved, _), row in zip(chunk, saved):
+                    if on_saved:
+                        on_saved(row)
+
+    async def flush(self):
+        async with self._lock:
+            timezones, self.timezones = self.timezones, {}
+            tasks, self.tasks = self.tasks, []
+            reminders, self.reminders = self.reminders, []
+            if not (timezones or tasks or reminders):
+                return
+
+            self.counters["flushes"] += 1
+            if timezones:
+                await self._flush_timezones(timezones)
+            if tasks:
+                await self._flush_tasks(tasks)
+            if reminders:
+                await self._flush_reminders(reminders)
+
+    async def run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.close()
@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from benchmarks.fake_postgrest import FakePostgrest
+from models.database import Database
+from models.postgrest import PostgrestStorage
+from models.sqlite import SQLiteStorage
+
+# Tests taking backend run once against the SQLite backend and once against
+# PostgrestStorage talking to the in-process PostgREST stand-in. backend(scenario)
+# awaits scenario(storage) with the storage open and installed as
+# Database.storage.
+@pytest.fixture(params=["sqlite", "postgrest"])
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(Database, "storage", Database.storage)
+    monkeypatch.setattr(Database, "writes", None)
+
+    def run(scenario):
+        async def wrapped():
+            server = None
+            if request.param == "sqlite":
+                storage = SQLiteStorage(str(tmp_path / "test.db"))
+            else:
+                server = FakePostgrest()
+                port = await server.start()
+                storage = PostgrestStorage(
+                    base_url=f"http://127.0.0.1:{port}",
+                    headers={"Content-Type": "application/json", "Prefer": "resolution=merge-duplicates"}
+                )
+            await storage.open()
+            Database.storage = storage
+            Database.cache.clear()
+            try:
+                return await scenario(storage)
+            finally:
+                await storage.close()
+                if server:
+                    await server.stop()
+        return asyncio.run(wrapped())
+    return run
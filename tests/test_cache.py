@@ -0,0 +1,72 @@
+import pytest
+from utils import cache
+from utils.cache import TTLCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+def test_entries_expire_after_their_ttl(clock):
+    c = TTLCache(ttl=10)
+    c.set("a", 1)
+    c.set("b", 2, ttl=30)
+    clock[0] += 9.9
+    assert c.get("a") == 1
+    clock[0] += 0.1
+    assert c.get("a", None) is None
+    assert c.get("b") == 2
+    assert c.stats()["expirations"] == 1
+    assert len(c) == 1
+
+def test_least_recently_used_entry_is_evicted(clock):
+    c = TTLCache(maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    assert c.get("b", None) is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+    assert c.evictions == 1
+
+def test_setting_an_existing_key_refreshes_it(clock):
+    c = TTLCache(maxsize=2, ttl=10)
+    c.set("a", 1)
+    c.set("b", 2)
+    clock[0] += 5
+    c.set("a", 10)
+    c.set("c", 3)
+    assert c.get("b", None) is None
+    clock[0] += 9
+    assert c.get("a") == 10
+
+def test_cached_none_is_a_hit(clock):
+    c = TTLCache()
+    c.set("a", None)
+    assert c.get("a", "missing") is None
+    assert c.get("b", "missing") == "missing"
+    assert (c.hits, c.misses) == (1, 1)
+
+def test_invalidate_and_invalidate_where(clock):
+    c = TTLCache()
+    for key in range(5):
+        c.set(("tasks", key), key)
+    c.invalidate(("tasks", 0))
+    assert c.invalidate_where(lambda key, value: value % 2) == 2
+    assert sorted(key for _, key in c._data) == [2, 4]
+
+def test_stats_hit_ratio(clock):
+    c = TTLCache()
+    assert c.stats()["hit_ratio"] == 0.0
+    c.set("a", 1)
+    c.get("a")
+    c.get("a")
+    c.get("b", None)
+    assert c.stats()["hit_ratio"] == 0.667
+
+def test_zero_ttl_never_serves_entries(clock):
+    c = TTLCache(ttl=0)
+    c.set("a", 1)
+    assert c.get("a", None) is None
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import discord
+import pytest
+from models.database import Database
+from models.errors import StorageUnavailable
+from models.sqlite import SQLiteStorage
+from cogs.reminders import Reminders
+
+class FakeDMs:
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    async def send(self, user_id, **kwargs):
+        if self.error:
+            raise self.error
+        self.sent.append(user_id)
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = SQLiteStorage(str(tmp_path / "test.db"))
+    monkeypatch.setattr(Database, "storage", storage)
+    monkeypatch.setattr(Database, "writes", None)
+    Database.cache.clear()
+    return storage
+
+def run(storage, scenario):
+    async def wrapped():
+        await storage.open()
+        try:
+            return await scenario()
+        finally:
+            await storage.close()
+    return asyncio.run(wrapped())
+
+def forbidden():
+    return discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Cannot send messages to this user")
+
+async def due_reminder(user_id=1, recurrence=None):
+    remind_at = (datetime.now(timezone.utc) - timedelta(seconds=5)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    await Database.add_reminder(user_id, "hello", remind_at, recurrence=recurrence)
+    now = datetime.now(timezone.utc)
+    return await Database.get_due_reminders(
+        (now - timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    )
+
+def cog(dms):
+    return Reminders(SimpleNamespace(dms=dms))
+
+def test_delivered_one_shot_reminders_are_deleted(storage):
+    async def scenario():
+        reminders = cog(FakeDMs())
+        failed = await reminders.deliver_reminders(await due_reminder())
+        return failed, await storage.get_reminders(1)
+
+    failed, rows = run(storage, scenario)
+    assert failed == []
+    assert rows == []
+
+def test_unreachable_users_do_not_keep_their_reminders(storage):
+    async def scenario():
+        reminders = cog(FakeDMs(forbidden()))
+        failed = await reminders.deliver_reminders(await due_reminder())
+        return failed, await storage.get_reminders(1)
+
+    failed, rows = run(storage, scenario)
+    assert failed == []
+    assert rows == []
+
+def test_transient_failures_are_returned_for_retry(storage):
+    async def scenario():
+        reminders = cog(FakeDMs(RuntimeError("gateway hiccup")))
+        due = await due_reminder()
+        failed = await reminders.deliver_reminders(due)
+        return due, failed, await storage.get_reminders(1)
+
+    due, failed, rows = run(storage, scenario)
+    assert failed == due
+    assert len(rows) == 1
+
+def test_given_up_reminders_are_postponed_and_released(storage):
+    async def scenario():
+        reminders = cog(FakeDMs(RuntimeError("gateway hiccup")))
+        due = await due_reminder(recurrence="0 9 * * *")
+        await reminders.deliver_reminders(due)
+        await reminders.postpone_reminders(due)
+        return due[0], await storage._run(storage._query, "SELECT * FROM reminders")
+
+    reminder, rows = run(storage, scenario)
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["claimed_by"] is None and row["claimed_until"] is None
+    assert row["recurrence"] == "0 9 * * *"
+    postponed = datetime.strptime(row["remind_at"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    assert postponed > datetime.now(timezone.utc) > reminder.remind_at
+
+def test_failed_settle_is_retried_while_holding_the_claim(storage, monkeypatch):
+    monkeypatch.setattr("cogs.reminders.backoff", lambda attempt, base, cap: 0)
+    delete = storage.delete_reminders
+    failures = [StorageUnavailable("timeout")]
+
+    async def flaky_delete(reminder_ids):
+        if failures:
+            raise failures.pop()
+        await delete(reminder_ids)
+
+    monkeypatch.setattr(storage, "delete_reminders", flaky_delete)
+
+    async def scenario():
+        dms = FakeDMs()
+        reminders = cog(dms)
+        due = await due_reminder()
+        await reminders.deliver_reminders(due)
+        assert reminders.settling
+        await asyncio.gather(*reminders.settling)
+        return dms.sent, await storage._run(storage._query, "SELECT * FROM reminders")
+
+    sent, rows = run(storage, scenario)
+    assert sent == [1]
+    assert rows == []
+
+def test_claims_exclude_other_owners_until_the_lease_lapses(storage):
+    async def scenario():
+        due = await due_reminder()
+        ids = [r.id for r in due]
+        first = await Database.claim_reminders(ids, owner="a", lease=60)
+        taken = await Database.claim_reminders(ids, owner="b", lease=60)
+        renewed = await Database.claim_reminders(ids, owner="a", lease=60)
+        await Database.claim_reminders(ids, owner="a", lease=-1)
+        lapsed = await Database.claim_reminders(ids, owner="b", lease=60)
+        return ids, first, taken, renewed, lapsed
+
+    ids, first, taken, renewed, lapsed = run(storage, scenario)
+    assert first == set(ids)
+    assert taken == set()
+    assert renewed == set(ids)
+    assert lapsed == set(ids)
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+from models.database import Database
+
+START = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+def test_task_pages_walk_forward_and_back(backend):
+    async def scenario(storage):
+        await storage.add_tasks([{"user_id": 1, "task": f"task {i}", "priority": 2} for i in range(7)])
+        await storage.add_tasks([{"user_id": 2, "task": "other", "priority": 1}])
+        first, more_first = await Database.get_task_page(1, limit=3)
+        second, more_second = await Database.get_task_page(1, cursor=first[-1].id, limit=3)
+        last, more_last = await Database.get_task_page(1, cursor=second[-1].id, limit=3)
+        back, more_back = await Database.get_task_page(1, cursor=last[0].id, backward=True, limit=3)
+        return (first, more_first), (second, more_second), (last, more_last), (back, more_back)
+
+    pages = backend(scenario)
+    assert [[t.task for t in page] for page, _ in pages] == [
+        ["task 0", "task 1", "task 2"],
+        ["task 3", "task 4", "task 5"],
+        ["task 6"],
+        ["task 3", "task 4", "task 5"],
+    ]
+    assert [more for _, more in pages] == [True, True, False, True]
+
+def test_reminder_pages_order_by_time_then_id(backend):
+    async def scenario(storage):
+        # Two reminders share each time, so the cursor needs the id as well.
+        times = [START + timedelta(hours=i // 2) for i in range(5)]
+        await storage.add_reminders([
+            {"user_id": 1, "message": f"r{i}", "remind_at": at.strftime("%Y-%m-%dT%H:%M:%SZ")}
+            for i, at in reversed(list(enumerate(times)))
+        ])
+        first, _ = await Database.get_reminder_page(1, limit=2)
+        cursor = (first[-1].remind_at, first[-1].id)
+        second, more = await Database.get_reminder_page(1, cursor=cursor, limit=2)
+        cursor = (second[0].remind_at, second[0].id)
+        back, _ = await Database.get_reminder_page(1, cursor=cursor, backward=True, limit=2)
+        return first, second, more, back
+
+    first, second, more, back = backend(scenario)
+    assert [(r.remind_at.hour, r.id) for r in first] == [(9, 4), (9, 5)]
+    assert [(r.remind_at.hour, r.id) for r in second] == [(10, 2), (10, 3)]
+    assert more
+    assert back == first
+
+def test_first_page_is_cached_until_a_write(backend):
+    async def scenario(storage):
+        await Database.add_task(1, "first", 2)
+        page, _ = await Database.get_task_page(1, limit=5)
+        await storage.add_task(1, "written behind the cache's back", 2)
+        cached, _ = await Database.get_task_page(1, limit=5)
+        await Database.add_task(1, "through Database", 2)
+        fresh, _ = await Database.get_task_page(1, limit=5)
+        return page, cached, fresh
+
+    page, cached, fresh = backend(scenario)
+    assert cached == page
+    assert len(fresh) == 3
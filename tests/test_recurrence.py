@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+import pytest
+from cogs.reminders import render_reminder_page
+from models.records import Reminder
+from utils.recurrence import compile_rule, following, next_occurrence, normalize_rule
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("rule", ["* * *", "60 * * * *", "0 24 * * *", "0 0 0 * *", "0 0 * 13 *", "0 0 * * 8", "*/0 * * * *", "5-1 * * * *"])
+def test_compile_rule_rejects_invalid_rules(rule):
+    with pytest.raises(ValueError):
+        compile_rule(rule)
+
+def test_compile_rule_expands_lists_ranges_and_steps():
+    minutes, hours, days, months, weekdays, _, _ = compile_rule("0,30 9-11 */10 * 7")
+    assert minutes == (0, 30)
+    assert hours == (9, 10, 11)
+    assert days == {1, 11, 21, 31}
+    assert months == set(range(1, 13))
+    assert weekdays == {0}
+
+def test_normalize_rule_expands_aliases_against_the_first_occurrence():
+    first = datetime(2025, 1, 1, 9, 30)  # a Wednesday
+    assert normalize_rule("daily", first) == "30 9 * * *"
+    assert normalize_rule("Weekly", first) == "30 9 * * 3"
+    assert normalize_rule("weekdays", first) == "30 9 * * 1-5"
+    assert normalize_rule(" 0  9 * * 1 ", first) == "0 9 * * 1"
+
+def test_next_occurrence_is_strictly_after():
+    assert next_occurrence("0 9 * * *", 0, utc(2025, 1, 1, 9, 0)) == utc(2025, 1, 2, 9, 0)
+    assert next_occurrence("0 9 * * *", 0, utc(2025, 1, 1, 8, 59, 30)) == utc(2025, 1, 1, 9, 0)
+
+def test_next_occurrence_uses_the_owner_offset():
+    # 09:00 at UTC+2 is 07:00 UTC.
+    assert next_occurrence("0 9 * * *", 2, utc(2025, 1, 1, 0, 0)) == utc(2025, 1, 1, 7, 0)
+    assert next_occurrence("0 9 * * *", -5, utc(2025, 1, 1, 15, 0)) == utc(2025, 1, 2, 14, 0)
+
+def test_weekdays_skip_the_weekend():
+    rule = normalize_rule("weekdays", datetime(2025, 1, 4, 9, 0))  # a Saturday
+    assert next_occurrence(rule, 0, utc(2025, 1, 3, 9, 0)) == utc(2025, 1, 6, 9, 0)
+
+def test_day_and_weekday_restrictions_match_either():
+    # The 13th or any Friday, as in cron.
+    assert next_occurrence("0 0 13 * 5", 0, utc(2025, 1, 1)) == utc(2025, 1, 3)
+    assert next_occurrence("0 0 13 * 5", 0, utc(2025, 1, 10)) == utc(2025, 1, 13)
+
+def test_leap_day_rule_waits_for_a_leap_year():
+    assert next_occurrence("0 0 29 2 *", 0, utc(2025, 1, 1)) == utc(2028, 2, 29)
+
+def test_rule_that_never_matches_raises():
+    with pytest.raises(ValueError, match="never matches"):
+        next_occurrence("0 0 30 2 *", 0, utc(2025, 1, 1))
+
+def test_following_skips_missed_occurrences():
+    fired = utc(2025, 1, 1, 9, 0)
+    assert following("0 9 * * *", 0, fired, now=utc(2025, 1, 1, 9, 1)) == utc(2025, 1, 2, 9, 0)
+    assert following("0 9 * * *", 0, fired, now=utc(2025, 1, 5, 12, 0)) == utc(2025, 1, 6, 9, 0)
+
+def test_reminder_page_with_long_rules_fits_an_embed():
+    rule = "0,5,10,15,20,25,30,35,40,45,50,55 9-17 * * 1-5"
+    reminders = [Reminder(id=i, user_id=1, message="x" * 500, remind_at=utc(2025, 1, 1), recurrence=rule) for i in range(25)]
+    embed = render_reminder_page(reminders, 0, 0)
+    assert len(embed.description) <= 4096
+    assert rule in embed.description
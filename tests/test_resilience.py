@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from utils import resilience
+from utils.resilience import CircuitBreaker, backoff, hedged
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.counters == {"opened": 1, "rejected": 1}
+    clock[0] += 4
+    assert breaker.retry_in() == 6
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.retry_in() == 0
+    assert breaker.allow()
+
+def test_failed_probe_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.retry_in() == 10
+    assert breaker.counters["opened"] == 2
+
+def test_probe_that_never_reports_back_stops_blocking(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+    clock[0] += 9
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+def test_zero_threshold_disables_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+def test_backoff_stays_within_the_exponential_bound():
+    for attempt in range(8):
+        assert 0 <= backoff(attempt, base=0.1, cap=2.0) <= min(2.0, 0.1 * 2 ** attempt)
+
+def test_hedged_returns_the_first_success():
+    calls = []
+
+    async def factory():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+            return "slow"
+        return "fast"
+
+    assert asyncio.run(hedged(factory, 0.01)) == ("fast", True)
+    assert asyncio.run(hedged(lambda: asyncio.sleep(0, "quick"), 1)) == ("quick", False)
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from models.records import Reminder
+from utils.scheduler import ReminderScheduler
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+def reminder(rid, seconds):
+    return Reminder(id=rid, user_id=1, message=f"reminder {rid}", remind_at=NOW + timedelta(seconds=seconds))
+
+def scheduler(rows=(), **kwargs):
+    fetched = []
+
+    async def fetch(start, end):
+        fetched.append((start, end))
+        return list(rows)
+
+    async def deliver(due):
+        return []
+
+    s = ReminderScheduler(fetch, deliver, **kwargs)
+    s.fetched = fetched
+    return s
+
+def refill(s, now=NOW):
+    asyncio.run(s.refill(now))
+
+def test_refill_schedules_reminders_inside_the_window():
+    s = scheduler([reminder(1, -30), reminder(2, 60)], lookahead=300, catchup=60)
+    refill(s)
+    assert len(s) == 2
+    assert s.fetched == [("2025-01-01T11:59:00Z", "2025-01-01T12:05:00Z")]
+
+def test_refill_window_reaches_back_to_the_previous_refill():
+    s = scheduler(lookahead=300, catchup=60)
+    refill(s)
+    refill(s, NOW + timedelta(seconds=120))
+    assert s.fetched[-1] == ("2025-01-01T11:59:00Z", "2025-01-01T12:07:00Z")
+
+def test_failed_fetch_keeps_the_horizon_and_retries_sooner():
+    async def fetch(start, end):
+        raise RuntimeError("down")
+
+    s = ReminderScheduler(fetch, None, refetch_interval=120)
+    refill(s)
+    assert s._horizon is None
+    assert s._next_refetch == NOW + timedelta(seconds=30)
+
+def test_add_ignores_reminders_past_the_horizon_and_duplicates():
+    s = scheduler(lookahead=300)
+    assert not s.add(reminder(1, 10))
+    refill(s)
+    assert s.add(reminder(1, 10))
+    assert not s.add(reminder(1, 10))
+    assert not s.add(reminder(2, 301))
+    assert len(s) == 1
+
+def test_pop_due_returns_due_reminders_in_order():
+    s = scheduler([reminder(3, 30), reminder(1, -10), reminder(2, 0)])
+    refill(s)
+    assert [r.id for r in s.pop_due(NOW)] == [1, 2]
+    assert len(s) == 1
+    assert [r.id for r in s.pop_due(NOW + timedelta(seconds=30))] == [3]
+
+def test_delivered_reminders_are_not_scheduled_again():
+    rows = [reminder(1, 0)]
+    s = scheduler(rows)
+    refill(s)
+    s.pop_due(NOW)
+    refill(s, NOW + timedelta(seconds=5))
+    assert len(s) == 0
+
+def test_discarded_reminders_are_skipped():
+    s = scheduler([reminder(1, 0)])
+    refill(s)
+    s.discard("1")
+    assert s.pop_due(NOW) == []
+
+def test_retry_backs_off_and_gives_up():
+    s = scheduler([reminder(1, 0)], max_attempts=3, retry_delay=30)
+    refill(s)
+    r = s.pop_due(NOW)[0]
+    assert s.retry(r, NOW)
+    assert s.pop_due(NOW + timedelta(seconds=29)) == []
+    assert s.pop_due(NOW + timedelta(seconds=30)) == [r]
+    assert s.retry(r, NOW + timedelta(seconds=30))
+    assert s.pop_due(NOW + timedelta(seconds=89)) == []
+    assert s.pop_due(NOW + timedelta(seconds=90)) == [r]
+    assert not s.retry(r, NOW + timedelta(seconds=90))
+    assert len(s) == 0
+
+def test_run_hands_reminders_the_scheduler_gave_up_on_to_give_up():
+    async def scenario():
+        gave_up = []
+        due = reminder(1, -1)
+
+        async def fetch(start, end):
+            return [due]
+
+        async def deliver(reminders):
+            return reminders
+
+        async def give_up(reminders):
+            gave_up.extend(reminders)
+
+        s = ReminderScheduler(fetch, deliver, lookahead=3600, max_attempts=2, retry_delay=0.01, give_up=give_up)
+        s._horizon = NOW + timedelta(days=3650)
+        s._last_refill = s._next_refetch = datetime.now(timezone.utc) + timedelta(hours=1)
+        s.add(due)
+        s.start()
+        await asyncio.sleep(0.2)
+        s.stop()
+        return gave_up
+
+    assert [r.id for r in asyncio.run(scenario())] == [1]
+
+def test_released_reminder_is_scheduled_by_the_next_refill():
+    s = scheduler([reminder(1, 0)])
+    refill(s)
+    r = s.pop_due(NOW)[0]
+    s.release(r)
+    refill(s, NOW + timedelta(seconds=5))
+    assert s.pop_due(NOW + timedelta(seconds=5)) == [r]
+
+def test_release_keeps_a_rescheduled_occurrence_delivered():
+    s = scheduler([reminder(1, 0)])
+    refill(s)
+    r = s.pop_due(NOW)[0]
+    s.release(reminder(1, 60))
+    assert s._delivered == {1: r.remind_at}
+
+def test_lapsed_claim_is_delivered_once_the_lease_expires():
+    # Another process claimed the reminder and died; once its lease lapses
+    # the reminder is still inside the refill window and gets delivered.
+    rows = [reminder(1, 0)]
+    lease, catchup = 120, 120
+    s = scheduler(rows, refetch_interval=60, catchup=catchup)
+    refill(s)
+    s.release(s.pop_due(NOW)[0])
+
+    now = NOW
+    while now < NOW + timedelta(seconds=lease):
+        now += timedelta(seconds=60)
+        refill(s, now)
+    assert s.fetched[-1][0] <= "2025-01-01T12:00:00Z"
+    assert [r.id for r in s.pop_due(now)] == [1]
@@ -0,0 +1,80 @@
+from utils.search import TrigramIndex, rank, relevance, search_terms
+
+def row(task_id, task, priority=2, user_id=1):
+    return {"id": task_id, "user_id": user_id, "task": task, "priority": priority}
+
+def ids(rows):
+    return [r["id"] for r in rows]
+
+def test_search_terms_are_lowercase_unique_words():
+    assert search_terms("Buy MILK, buy eggs!") == ["buy", "milk", "eggs"]
+    assert len(search_terms(" ".join(f"w{i}" for i in range(20)))) == 8
+
+def test_relevance_prefers_whole_words_then_prefixes():
+    assert relevance("write report", ["report"]) == 3
+    assert relevance("write reports", ["report"]) == 2
+    assert relevance("misreported", ["report"]) == 1
+    assert relevance("write", ["report"]) == 0
+
+def test_rank_orders_by_priority_then_relevance_then_age():
+    rows = [row(1, "misreported", 2), row(2, "report", 2), row(3, "reports", 1), row(4, "report", 2)]
+    assert ids(rank(rows, ["report"], 3)) == [3, 2, 4]
+
+def build(rows, user_id=1):
+    index = TrigramIndex()
+    assert index.build(user_id, rows, index.generation)
+    return index
+
+def test_index_finds_rows_containing_every_term():
+    index = build([row(1, "Write quarterly report"), row(2, "Report bug"), row(3, "write tests")])
+    assert ids(index.search(1, ["report"], 10)) == [1, 2]
+    assert ids(index.search(1, ["write", "report"], 10)) == [1]
+    assert index.search(1, ["missing"], 10) == []
+
+def test_short_terms_are_checked_without_trigrams():
+    index = build([row(1, "good food"), row(2, "go to gym"), row(3, "groceries")])
+    assert ids(index.search(1, ["go"], 10)) == [2, 1]
+    assert ids(index.search(1, ["go", "gym"], 10)) == [2]
+
+def test_index_follows_adds_and_discards():
+    index = build([row(1, "report")])
+    index.add(1, row(2, "second report"))
+    index.add(2, row(3, "not indexed yet", user_id=2))
+    index.discard(1)
+    assert ids(index.search(1, ["report"], 10)) == [2]
+    assert 2 not in index
+    assert not any(1 in ids for ids in index.users[1][1].values())
+
+def test_builds_that_raced_a_write_are_rejected():
+    index = TrigramIndex()
+    generation = index.generation
+    index.add(1, row(1, "report"))
+    assert not index.build(1, [], generation)
+    assert 1 not in index
+
+def test_least_recent_searchers_are_evicted():
+    index = TrigramIndex(max_users=2)
+    for user_id in (1, 2):
+        index.build(user_id, [row(user_id, "report", user_id=user_id)], index.generation)
+    index.search(1, ["report"], 1)
+    index.build(3, [row(3, "report", user_id=3)], index.generation)
+    assert 1 in index and 3 in index and 2 not in index
+    assert 2 not in index.owners
+
+def test_forget_drops_a_user():
+    index = build([row(1, "report")])
+    index.forget(1)
+    assert 1 not in index
+    assert index.owners == {}
+
+def test_search_tasks_matches_on_both_backends(backend):
+    from models.database import Database
+
+    async def scenario(storage):
+        await Database.add_tasks(1, [("Write quarterly report", 2), ("Report bug", 1), ("write tests", 2)])
+        await Database.add_tasks(2, [("report for someone else", 1)])
+        return await Database.search_tasks(1, "REPORT", 10), await Database.search_tasks(1, "write report", 10)
+
+    any_report, both = backend(scenario)
+    assert [t.task for t in any_report] == ["Report bug", "Write quarterly report"]
+    assert [t.task for t in both] == ["Write quarterly report"]
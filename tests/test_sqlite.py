@@ -0,0 +1,112 @@
+import asyncio
+import sqlite3
+import pytest
+from config import OWNERSHIP_BUCKETS
+from models.errors import StorageRequestError, StorageUnavailable
+from models.sqlite import SQLiteStorage
+
+@pytest.fixture
+def sqlite(tmp_path):
+    def run(scenario, path=None):
+        async def wrapped():
+            storage = SQLiteStorage(str(path or tmp_path / "test.db"))
+            await storage.open()
+            try:
+                return await scenario(storage)
+            finally:
+                await storage.close()
+        return asyncio.run(wrapped())
+    return run
+
+def test_timezones_are_upserted(sqlite):
+    async def scenario(storage):
+        await storage.set_user_timezone(1, 2)
+        await storage.set_user_timezones([{"user_id": 1, "utc_offset": -5}, {"user_id": 2, "utc_offset": 9}])
+        return await storage.get_user_timezone(1), await storage.get_user_timezone(3)
+
+    first, missing = sqlite(scenario)
+    assert [row["utc_offset"] for row in first] == [-5]
+    assert missing == []
+
+def test_tasks_are_added_and_deleted_in_bulk(sqlite):
+    async def scenario(storage):
+        await storage.add_task(1, "single", 1)
+        await storage.add_tasks([{"user_id": 1, "task": f"bulk {i}", "priority": 2} for i in range(3)])
+        await storage.add_task(2, "someone else's", 3)
+        rows = await storage.get_tasks(1)
+        await storage.delete_tasks([rows[0]["id"], rows[2]["id"]])
+        return [row["task"] for row in await storage.get_tasks(1)]
+
+    assert sqlite(scenario) == ["bulk 0", "bulk 2"]
+
+def test_added_reminders_come_back_with_their_ids(sqlite):
+    async def scenario(storage):
+        rows = [
+            {"user_id": 1, "message": "once", "remind_at": "2025-01-01T09:00:00Z"},
+            {"user_id": 1, "message": "daily", "remind_at": "2025-01-01T10:00:00Z", "recurrence": "0 10 * * *", "utc_offset": 1},
+        ]
+        saved = await storage.add_reminders(rows)
+        due = await storage.get_due_reminders("2025-01-01T08:00:00Z", "2025-01-01T10:00:00Z")
+        return saved, due
+
+    saved, due = sqlite(scenario)
+    assert [(row["id"], row["message"]) for row in saved] == [(1, "once"), (2, "daily")]
+    assert [(row["message"], row["recurrence"], row["utc_offset"] or 0) for row in due] == [("once", None, 0), ("daily", "0 10 * * *", 1)]
+
+def test_due_reminders_can_be_limited_to_buckets(sqlite):
+    async def scenario(storage):
+        await storage.add_reminders([
+            {"user_id": user_id, "message": "hi", "remind_at": "2025-01-01T09:00:00Z", "bucket": user_id}
+            for user_id in (1, 5, 9)
+        ])
+        return await storage.get_due_reminders("2025-01-01T08:00:00Z", "2025-01-01T09:00:00Z", (4, 9))
+
+    assert [row["user_id"] for row in sqlite(scenario)] == [5]
+
+def test_pomodoro_settings_and_sessions_round_trip(sqlite):
+    async def scenario(storage):
+        settings = {"user_id": 1, "work_duration": 50, "break_duration": 10, "long_break_duration": 30, "sessions_before_long_break": 2}
+        await storage.save_pomodoro_settings(settings)
+        await storage.save_pomodoro_settings(dict(settings, work_duration=45))
+        session = {
+            "user_id": 1, "state": "WORKING", "phase_ends_at": "2025-01-01T09:25:00+00:00", "completed_sessions": 1,
+            "work_duration": 45, "break_duration": 10, "long_break_duration": 30, "sessions_before_long_break": 2,
+        }
+        await storage.save_active_pomodoros([session, dict(session, user_id=2)])
+        await storage.delete_active_pomodoros([2])
+        return (
+            await storage.get_pomodoro_settings(1),
+            await storage.get_active_pomodoros(),
+            await storage.get_active_pomodoro(2),
+        )
+
+    settings, sessions, removed = sqlite(scenario)
+    assert settings[0]["work_duration"] == 45
+    assert [(row["user_id"], row["state"], row["message_id"]) for row in sessions] == [(1, "WORKING", None)]
+    assert removed == []
+
+def test_missing_columns_are_added_and_buckets_backfilled(sqlite, tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, message TEXT NOT NULL, remind_at TEXT NOT NULL)")
+    conn.execute("INSERT INTO reminders (user_id, message, remind_at) VALUES (1025, 'old', '2025-01-01T09:00:00Z')")
+    conn.commit()
+    conn.close()
+
+    async def scenario(storage):
+        return await storage.get_due_reminders("2025-01-01T08:00:00Z", "2025-01-01T09:00:00Z")
+
+    rows = sqlite(scenario, path)
+    assert rows[0]["bucket"] == 1025 % OWNERSHIP_BUCKETS
+    assert rows[0]["claimed_by"] is None
+
+def test_sqlite_errors_become_storage_errors(sqlite):
+    async def scenario(storage):
+        def fail(error):
+            raise error
+        with pytest.raises(StorageUnavailable):
+            await storage._run(fail, sqlite3.OperationalError("database is locked"))
+        with pytest.raises(StorageRequestError):
+            await storage.add_tasks([{"user_id": 1, "task": None, "priority": 1}])
+
+    sqlite(scenario)
@@ -0,0 +1,24 @@
+def reminder_row(user_id=1, remind_at="2025-01-01T09:00:00Z", **extra):
+    return dict({"user_id": user_id, "message": "hello", "remind_at": remind_at}, **extra)
+
+def test_reschedule_moves_reminders_and_clears_their_claim(backend):
+    async def scenario(storage):
+        saved = await storage.add_reminders([reminder_row(recurrence="0 9 * * *", utc_offset=0) for _ in range(2)])
+        ids = [int(row["id"]) for row in saved]
+        await storage.claim_reminders(ids, "a", "2025-01-01T09:00:00Z", "2025-01-01T09:02:00Z")
+        await storage.reschedule_reminders([{"id": rid, "remind_at": "2025-01-02T09:00:00Z"} for rid in ids])
+        return await storage.get_due_reminders("2025-01-02T08:59:00Z", "2025-01-02T09:00:00Z")
+
+    rows = backend(scenario)
+    assert len(rows) == 2
+    assert all(row["claimed_by"] is None and row["claimed_until"] is None for row in rows)
+
+def test_reschedule_does_not_recreate_deleted_reminders(backend):
+    async def scenario(storage):
+        saved = await storage.add_reminders([reminder_row(recurrence="0 9 * * *", utc_offset=0)])
+        rid = int(saved[0]["id"])
+        await storage.delete_reminders([rid])
+        await storage.reschedule_reminders([{"id": rid, "remind_at": "2025-01-02T09:00:00Z"}])
+        return await storage.get_reminders(1)
+
+    assert backend(scenario) == []
@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import pytest
+from utils import taskimport
+from utils.taskimport import MAX_TASK_LENGTH, is_csv, is_text, parse_record, read_records, stream_lines
+
+async def lines_of(text):
+    for line in text.split("\n"):
+        yield line
+
+def records(text, csv_format=True):
+    async def collect():
+        return [record async for record in read_records(lines_of(text), csv_format)]
+    return asyncio.run(collect())
+
+def test_attachment_types():
+    assert is_csv(SimpleNamespace(filename="tasks.CSV", content_type=None))
+    assert is_csv(SimpleNamespace(filename="export", content_type="text/csv; charset=utf-8"))
+    assert is_text(SimpleNamespace(filename="notes.txt", content_type=None))
+    assert not is_text(SimpleNamespace(filename="photo.png", content_type="image/png"))
+
+def test_quoted_fields_may_span_lines():
+    assert records('task,priority\n"first\nsecond",1\nthird,2') == [
+        (1, ["task", "priority"]),
+        (3, ["first\nsecond", "1"]),
+        (4, ["third", "2"]),
+    ]
+
+def test_stray_quote_in_an_unquoted_field_keeps_every_record():
+    assert [fields for _, fields in records('5" screws,1\nnails,2\n')] == [['5" screws', "1"], ["nails", "2"], []]
+
+def test_unterminated_quote_runs_to_the_end():
+    assert records('ok,1\n"open,2\nrest') == [(1, ["ok", "1"]), (3, ["open,2\nrest\n"])]
+
+def test_text_lines_are_not_split_on_commas():
+    assert records("buy milk, eggs\n", csv_format=False) == [(1, ["buy milk, eggs"]), (2, [""])]
+
+def test_parse_record_limits():
+    assert parse_record(["Task", "Priority"], True) is None
+    assert parse_record(["  "], True) is None
+    assert parse_record(["write tests"], True) == ("write tests", 2)
+    assert parse_record(["write tests", "1"], True) == ("write tests", 1)
+    assert parse_record(["x" * MAX_TASK_LENGTH], True) == ("x" * MAX_TASK_LENGTH, 2)
+    with pytest.raises(ValueError, match="longer than"):
+        parse_record(["x" * (MAX_TASK_LENGTH + 1)], True)
+    with pytest.raises(ValueError, match="priority '4'"):
+        parse_record(["write tests", "4"], True)
+
+def test_header_names_are_kept_in_text_files():
+    assert parse_record(["task"], False) == ("task", 2)
+
+def serve(monkeypatch, body):
+    client = httpx.AsyncClient
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    monkeypatch.setattr(taskimport.httpx, "AsyncClient", lambda **kwargs: client(transport=transport, **kwargs))
+
+def stream(max_bytes):
+    async def collect():
+        return [line async for line in stream_lines("http://files.test/tasks.csv", max_bytes)]
+    return asyncio.run(collect())
+
+def test_stream_lines_strips_the_byte_order_mark(monkeypatch):
+    serve(monkeypatch, "\ufefftask,priority\r\nwrite tests,1\r\n".encode())
+    assert stream(1024) == ["task,priority", "write tests,1"]
+
+def test_stream_lines_stops_at_the_byte_cap(monkeypatch):
+    serve(monkeypatch, b"a,1\n" * 100)
+    with pytest.raises(ValueError, match="larger than"):
+        stream(200)
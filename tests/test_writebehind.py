@@ -0,0 +1,112 @@
+import asyncio
+from models.errors import StorageRequestError, StorageUnavailable
+from models.writebehind import WriteBehindBuffer
+
+class FakeStorage:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.tasks = []
+        self.reminders = []
+        self.timezones = {}
+        self.calls = 0
+
+    def _maybe_fail(self):
+        self.calls += 1
+        if self.failures:
+            error = self.failures.pop(0)
+            if error:
+                raise error
+
+    async def add_tasks(self, rows):
+        self._maybe_fail()
+        self.tasks.extend(row["task"] for row in rows)
+
+    async def add_reminders(self, rows):
+        self._maybe_fail()
+        saved = [dict(row, id=len(self.reminders) + i + 1) for i, row in enumerate(rows)]
+        self.reminders.extend(saved)
+        return saved
+
+    async def set_user_timezones(self, rows):
+        self._maybe_fail()
+        self.timezones.update((row["user_id"], row["utc_offset"]) for row in rows)
+
+def task(name):
+    return {"user_id": 1, "task": name, "priority": 2}
+
+def flush(buffer, times=1):
+    async def run():
+        for _ in range(times):
+            await buffer.flush()
+    asyncio.run(run())
+
+def test_only_failed_chunks_are_requeued():
+    storage = FakeStorage([None, StorageUnavailable("timeout")])
+    buffer = WriteBehindBuffer(storage, chunk_size=2)
+    for name in ("t0", "t1", "t2", "t3"):
+        buffer.add_task(task(name))
+    flush(buffer)
+    assert storage.tasks == ["t0", "t1"]
+    assert [row["task"] for row, _ in buffer.tasks] == ["t2", "t3"]
+    flush(buffer)
+    assert storage.tasks == ["t0", "t1", "t2", "t3"]
+    assert len(buffer) == 0
+
+def test_chunks_after_a_failure_keep_their_place_and_attempts():
+    storage = FakeStorage([StorageUnavailable("down")])
+    buffer = WriteBehindBuffer(storage, chunk_size=2)
+    for name in ("t0", "t1", "t2"):
+        buffer.add_task(task(name))
+    flush(buffer)
+    assert [(row["task"], attempts) for row, attempts in buffer.tasks] == [("t0", 1), ("t1", 1), ("t2", 0)]
+    buffer.add_task(task("t3"))
+    flush(buffer)
+    assert storage.tasks == ["t0", "t1", "t2", "t3"]
+
+def test_failing_chunks_are_dropped_after_max_attempts():
+    storage = FakeStorage([StorageUnavailable("timeout")] * 3)
+    buffer = WriteBehindBuffer(storage, chunk_size=2, max_attempts=3)
+    buffer.add_task(task("t0"))
+    flush(buffer, 5)
+    assert storage.calls == 3
+    assert storage.tasks == []
+    assert len(buffer) == 0
+    assert buffer.counters["dropped"] == 1
+
+def test_rejected_chunks_are_dropped_and_the_rest_is_sent():
+    storage = FakeStorage([StorageRequestError("bad row", status=400)])
+    buffer = WriteBehindBuffer(storage, chunk_size=1)
+    buffer.add_task(task("bad"))
+    buffer.add_task(task("good"))
+    flush(buffer)
+    assert storage.tasks == ["good"]
+    assert buffer.counters["dropped"] == 1
+
+def test_saved_reminders_are_matched_back_per_chunk():
+    storage = FakeStorage()
+    buffer = WriteBehindBuffer(storage, chunk_size=2)
+    saved = []
+    for i in range(3):
+        buffer.add_reminder({"user_id": 1, "message": f"r{i}"}, saved.append)
+    flush(buffer)
+    assert [(row["id"], row["message"]) for row in saved] == [(1, "r0"), (2, "r1"), (3, "r2")]
+
+def test_timezone_upserts_collapse_and_survive_failures():
+    storage = FakeStorage([StorageUnavailable("down")])
+    buffer = WriteBehindBuffer(storage)
+    buffer.set_user_timezone(1, 2)
+    buffer.set_user_timezone(1, 3)
+    flush(buffer)
+    buffer.set_user_timezone(1, 4)
+    flush(buffer)
+    assert storage.timezones == {1: 4}
+    assert buffer.counters["merged"] == 2
+
+def test_stop_reports_and_drops_unsaved_writes(capsys):
+    storage = FakeStorage([StorageUnavailable("down")])
+    buffer = WriteBehindBuffer(storage, chunk_size=2)
+    buffer.add_task(task("t0"))
+    asyncio.run(buffer.stop())
+    assert "stopped with 1 unsaved writes" in capsys.readouterr().out
+    assert len(buffer) == 0
+    assert buffer.counters["dropped"] == 1
@@ -0,0 +1,40 @@
+import hashlib
+import json
+import os
+
+def tree_payload(tree):
+    payload = []
+    for command in tree.get_commands():
+        try:
+            payload.append(command.to_dict(tree))
+        except TypeError:
+            payload.append(command.to_dict())
+    return sorted(payload, key=lambda command: (command.get("type", 1), command["name"]))
+
+def tree_hash(tree, application_id):
+    encoded = json.dumps([application_id, tree_payload(tree)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def read_hash(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def write_hash(path, digest):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(digest)
+    os.replace(tmp, path)
+
+async def sync_if_changed(tree, application_id, path):
+    # Global syncs are heavily rate limited, so only push the tree when its
+    # definitions differ from the last successful sync recorded at path.
+    digest = tree_hash(tree, application_id)
+    if read_hash(path) == digest:
+        return None
+
+    synced = await tree.sync()
+    write_hash(path, digest)
+    return synced
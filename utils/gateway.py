@@ -0,0 +1,21 @@
+import discord
+
+GATEWAY_PROFILES = ("full", "minimal")
+
+def gateway_options(profile="full"):
+    # Slash commands and outbound DMs arrive and leave over interactions and
+    # REST, so the minimal profile only keeps the guild list: no member,
+    # presence or message events, no member cache, no message cache and no
+    # member chunking at startup.
+    if profile == "minimal":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        return {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "max_messages": None,
+            "chunk_guilds_at_startup": False,
+        }
+    elif profile == "full":
+        return {"intents": discord.Intents.all()}
+    raise ValueError(f"Unknown gateway profile: {profile}")
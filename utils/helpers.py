@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import re
 
 def validate_time_format(time_str):
@@ -17,10 +17,19 @@ def create_progress_bar(progress, bars=10):
     empty = bars - filled
     return "█" * filled + "░" * empty
 
-def get_utc_timestamps():
-    now = datetime.now(timezone.utc)
-    one_min_ago = now - timedelta(minutes=1)
-    return (
-        one_min_ago.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        now.strftime("%Y-%m-%dT%H:%M:%SZ")
-    )
+def truncate(text, length):
+    return text if len(text) <= length else text[:length - 3] + "..."
+
+def line_budget(count, limit=4000, overhead=40):
+    # Characters each of count lines may use so an embed description stays
+    # under Discord's 4096-character limit.
+    return max(min(limit // max(count, 1) - overhead, 200), 20)
+
+def to_utc_string(dt):
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def parse_utc_timestamp(value):
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
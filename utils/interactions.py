@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import time
+from datetime import datetime, timezone
+import discord
+from config import INTERACTION_DEFER_AFTER
+from utils.metrics import INTERACTIONS, INTERACTION_DEFERS
+
+# Discord drops an interaction that has not been answered within 3 seconds.
+# Handlers wrapped with deadline_aware are deferred once INTERACTION_DEFER_AFTER
+# seconds have passed since the interaction was created, and reply() and
+# edit() then finish them with a followup or an edit of the original response.
+
+def _age(interaction):
+    # Time the interaction spent reaching us, bounded so a skewed clock can
+    # neither use up the budget nor hide the delay.
+    try:
+        age = (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+    except (AttributeError, TypeError):
+        return 0.0
+    return min(max(age, 0.0), 1.0)
+
+class Deadline:
+    def __init__(self, interaction, name, ephemeral, budget):
+        self.interaction = interaction
+        self.name = name
+        self.ephemeral = ephemeral
+        self.started = time.monotonic() - _age(interaction)
+        self.budget = budget
+        self.lock = asyncio.Lock()
+        self.timer = None
+        self.placeholder = None
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def arm(self):
+        self.timer = asyncio.create_task(self._defer_later())
+
+    def disarm(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+    async def _defer_later(self):
+        await asyncio.sleep(max(self.budget - self.elapsed(), 0))
+        async with self.lock:
+            response = self.interaction.response
+            if response.is_done():
+                return
+            try:
+                if getattr(self.interaction, "type", None) == discord.InteractionType.component:
+                    await response.defer()
+                else:
+                    await response.defer(ephemeral=self.ephemeral, thinking=True)
+                    self.placeholder = self.ephemeral
+            except discord.HTTPException as e:
+                # The handler may still answer in time; nothing else to do.
+                print(f"Failed to defer {self.name}: {e}")
+                return
+            INTERACTION_DEFERS.inc(self.name)
+
+def _lock(interaction):
+    deadline = interaction.extras.get("deadline")
+    return deadline.lock if deadline else asyncio.Lock()
+
+async def reply(interaction, **kwargs):
+    # send_message, or a followup once the interaction has been deferred.
+    # The first followup replaces the "thinking" message and keeps its
+    # visibility, so a reply that wants the other one removes it first.
+    async with _lock(interaction):
+        if not interaction.response.is_done():
+            return await interaction.response.send_message(**kwargs)
+        deadline = interaction.extras.get("deadline")
+        if deadline and deadline.placeholder is not None:
+            placeholder, deadline.placeholder = deadline.placeholder, None
+            if placeholder != kwargs.get("ephemeral", False):
+                try:
+                    await interaction.delete_original_response()
+                except discord.HTTPException as e:
+                    print(f"Failed to remove the deferred response for {deadline.name}: {e}")
+        return await interaction.followup.send(**kwargs)
+
+async def edit(interaction, **kwargs):
+    # edit_message for component interactions, or an edit of the message
+    # once the interaction has been deferred.
+    async with _lock(interaction):
+        if interaction.response.is_done():
+            return await interaction.edit_original_response(**kwargs)
+        return await interaction.response.edit_message(**kwargs)
+
+def deadline_aware(ephemeral=False, budget=None):
+    # ephemeral picks how a deferred slash command or modal shows its
+    # "thinking" message; match it to the handler's usual reply.
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            interaction = next(arg for arg in args if hasattr(arg, "response") and hasattr(arg, "followup"))
+            name = interaction.command.qualified_name if interaction.command else func.__qualname__
+            deadline = Deadline(interaction, name, ephemeral, INTERACTION_DEFER_AFTER if budget is None else budget)
+            interaction.extras["deadline"] = deadline
+            INTERACTIONS.inc(name)
+            deadline.arm()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                deadline.disarm()
+        return wrapper
+    return decorator
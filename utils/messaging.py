@@ -0,0 +1,64 @@
+import asyncio
+import discord
+from utils.cache import TTLCache, _MISSING
+from utils.metrics import DISCORD_REQUEST_SECONDS
+
+class DMResolver:
+    def __init__(self, bot, maxsize=10000, ttl=3600):
+        self.bot = bot
+        self.users = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.channels = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight = {}
+
+    async def _once(self, key, factory):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def remember(self, user):
+        self.users.set(user.id, user)
+        if getattr(user, "dm_channel", None) is not None:
+            self.channels.set(user.id, user.dm_channel)
+
+    async def get_user(self, user_id):
+        user_id = int(user_id)
+        user = self.users.get(user_id)
+        if user is not _MISSING:
+            return user
+
+        user = self.bot.get_user(user_id)
+        if user is None:
+            user = await self._once(("user", user_id), lambda: self.bot.fetch_user(user_id))
+        self.users.set(user_id, user)
+        return user
+
+    async def get_dm_channel(self, user_id):
+        user_id = int(user_id)
+        channel = self.channels.get(user_id)
+        if channel is not _MISSING:
+            return channel
+
+        user = self.users.get(user_id, None) or self.bot.get_user(user_id)
+        channel = user.dm_channel if user else None
+        if channel is None:
+            channel = await self._once(
+                ("dm", user_id),
+                lambda: self.bot.create_dm(user or discord.Object(id=user_id))
+            )
+        self.channels.set(user_id, channel)
+        return channel
+
+    async def send(self, user_id, **kwargs):
+        channel = await self.get_dm_channel(user_id)
+        try:
+            with DISCORD_REQUEST_SECONDS.time("send"):
+                return await channel.send(**kwargs)
+        except discord.NotFound:
+            self.channels.invalidate(int(user_id))
+            raise
+
+    def stats(self):
+        return {"users": self.users.stats(), "channels": self.channels.stats()}
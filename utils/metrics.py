@@ -0,0 +1,244 @@
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LAG_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600)
+LOOP_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        return self.header() + self.summary()
+
+    def summary(self):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.values.items()]
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def set(self, value, *labels):
+        self.values[labels] = value
+
+    def set_function(self, fn):
+        self.fn = fn
+
+    def collect(self):
+        return {(): self.fn()} if self.fn else self.values
+
+    def render(self):
+        return self.header() + self.summary()
+
+    def summary(self):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.collect().items()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def quantile(self, labels, fraction):
+        # Upper bound of the bucket holding the requested rank.
+        counts, _, total = self.values[labels]
+        rank = fraction * total
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def render(self):
+        lines = self.header()
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+    def summary(self):
+        lines = []
+        for labels, (_, total, count) in sorted(self.values.items(), key=lambda item: -item[1][2]):
+            lines.append(
+                f"{self.name}{_labels(self.labelnames, labels)} n={count} avg={total / count:.3f}s "
+                f"p50<={_number(self.quantile(labels, 0.5))}s p99<={_number(self.quantile(labels, 0.99))}s"
+            )
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=(), fn=None):
+        return self.register(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.summary())
+        return lines
+
+class MetricsServer:
+    # Serves the registry in the Prometheus text format to any GET request.
+    def __init__(self, registry, host="127.0.0.1", port=9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Metrics available on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _serve(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            if request_line.split(b" ")[0] == b"GET":
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "405 Method Not Allowed", b""
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+registry = Registry()
+
+DB_REQUEST_SECONDS = registry.histogram(
+    "taskforce_db_request_seconds",
+    "Latency of PostgREST requests by endpoint and method",
+    ("endpoint", "method")
+)
+DB_ERRORS = registry.counter(
+    "taskforce_db_errors_total",
+    "Failed PostgREST requests by endpoint, method and status or exception",
+    ("endpoint", "method", "error")
+)
+DB_RETRIED = registry.counter(
+    "taskforce_db_retries_total",
+    "PostgREST requests retried after a transient failure",
+    ("endpoint", "method")
+)
+REMINDER_DISPATCH_LAG = registry.histogram(
+    "taskforce_reminder_dispatch_lag_seconds",
+    "Time between a reminder's remind_at and its delivery",
+    buckets=LAG_BUCKETS
+)
+ACTIVE_POMODOROS = registry.gauge(
+    "taskforce_active_pomodoro_sessions",
+    "Pomodoro sessions running in this process"
+)
+DISCORD_REQUEST_SECONDS = registry.histogram(
+    "taskforce_discord_request_seconds",
+    "Latency of outbound Discord message sends and edits",
+    ("action",)
+)
+INTERACTIONS = registry.counter(
+    "taskforce_interactions_total",
+    "Interactions handled under the response deadline, by command",
+    ("command",)
+)
+INTERACTION_DEFERS = registry.counter(
+    "taskforce_interaction_defers_total",
+    "Interactions deferred because they were about to miss the response deadline, by command",
+    ("command",)
+)
+LOOP_LAG = registry.histogram(
+    "taskforce_event_loop_lag_seconds",
+    "How late the event loop ran a scheduled heartbeat",
+    buckets=LOOP_BUCKETS
+)
+LOOP_STALLS = registry.counter(
+    "taskforce_event_loop_stalls_total",
+    "Times the event loop was blocked for longer than LOOP_LAG_THRESHOLD"
+)
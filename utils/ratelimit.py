@@ -0,0 +1,28 @@
+import time
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def headroom(self):
+        self._refill()
+        return max(self.tokens, 0) / self.burst
+
+    def try_acquire(self, tokens=1):
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def penalize(self, retry_after):
+        self._refill()
+        self.tokens = min(self.tokens, 0) - retry_after * self.rate
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+# Rules are stored as five-field cron expressions (minute hour day-of-month
+# month day-of-week, Sunday = 0) evaluated in the owner's fixed UTC offset.
+# "daily", "weekly" and "weekdays" are shorthands expanded against the first
+# occurrence when the reminder is created.
+
+FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 6),
+)
+
+ALIASES = ("daily", "weekly", "weekdays")
+
+def _parse_field(value, name, low, high):
+    values = set()
+    for part in value.split(","):
+        spec, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(v) for v in spec.split("-", 1))
+        else:
+            start = end = int(spec)
+            if step > 1:
+                end = high
+        if name == "weekday" and end == 7:
+            values.add(0)
+            end = 6
+            if start == 7:
+                continue
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"{name} must be between {low} and {high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+@lru_cache(maxsize=1024)
+def compile_rule(rule):
+    fields = rule.split()
+    if len(fields) != 5:
+        raise ValueError("expected 5 fields: minute hour day month weekday")
+
+    parsed = [_parse_field(value, *spec) for value, spec in zip(fields, FIELDS)]
+    minutes, hours, days, months, weekdays = parsed
+    return (
+        tuple(sorted(minutes)),
+        tuple(sorted(hours)),
+        frozenset(days),
+        frozenset(months),
+        frozenset(weekdays),
+        fields[2] != "*",
+        fields[4] != "*",
+    )
+
+def normalize_rule(value, first):
+    # first is the first occurrence in the owner's local time.
+    value = " ".join(value.lower().split())
+    if value == "daily":
+        return f"{first.minute} {first.hour} * * *"
+    elif value == "weekly":
+        return f"{first.minute} {first.hour} * * {first.isoweekday() % 7}"
+    elif value == "weekdays":
+        return f"{first.minute} {first.hour} * * 1-5"
+    compile_rule(value)
+    return value
+
+def _day_matches(compiled, day):
+    _, _, days, months, weekdays, days_restricted, weekdays_restricted = compiled
+    if day.month not in months:
+        return False
+    in_days = day.day in days
+    in_weekdays = day.isoweekday() % 7 in weekdays
+    if days_restricted and weekdays_restricted:
+        return in_days or in_weekdays
+    return in_days and in_weekdays
+
+@lru_cache(maxsize=4096)
+def next_occurrence(rule, utc_offset, after):
+    # First match strictly after the given UTC datetime. Reminders sharing a
+    # rule and offset fire at the same instant, so they share a cache entry.
+    compiled = compile_rule(rule)
+    minutes, hours = compiled[0], compiled[1]
+    offset = timedelta(hours=utc_offset)
+    local = (after + offset).replace(tzinfo=None, second=0, microsecond=0)
+
+    day = local.replace(hour=0, minute=0)
+    for _ in range(366 * 8):
+        if _day_matches(compiled, day):
+            for hour in hours:
+                for minute in minutes:
+                    candidate = day.replace(hour=hour, minute=minute)
+                    if candidate > local:
+                        return (candidate - offset).replace(tzinfo=timezone.utc)
+        day += timedelta(days=1)
+    raise ValueError(f"rule {rule!r} never matches")
+
+def following(rule, utc_offset, fired_at, now=None):
+    # The occurrence after the one that just fired, skipping any that were
+    # missed while the bot was down instead of sending them all at once.
+    now = now or datetime.now(timezone.utc)
+    upcoming = next_occurrence(rule, utc_offset, fired_at)
+    if upcoming <= now:
+        upcoming = next_occurrence(rule, utc_offset, now.replace(second=0, microsecond=0))
+    return upcoming
@@ -0,0 +1,84 @@
+import asyncio
+import random
+import time
+
+def backoff(attempt, base=0.1, cap=2.0):
+    # Full jitter: a random delay up to the exponential bound, so clients that
+    # failed together do not retry together.
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures and rejects calls for
+    # reset_timeout seconds. After that a single probe is let through; its
+    # success closes the circuit and its failure opens it again.
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self.counters = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+
+    def allow(self):
+        state = self.state
+        if state == "closed" or self.failure_threshold <= 0:
+            return True
+        now = time.monotonic()
+        # A probe that never reported back (cancelled, say) stops blocking
+        # others after another reset_timeout.
+        if state == "half-open" and (self.probe_started is None or now - self.probe_started >= self.reset_timeout):
+            self.probe_started = now
+            return True
+        self.counters["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if self.probe_started is not None or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                print(f"Circuit breaker opened after {self.failures} consecutive failures")
+            self.counters["opened"] += 1
+            self.opened_at = time.monotonic()
+            self.probe_started = None
+
+async def hedged(factory, delay):
+    # Runs factory() and, if it has not finished after delay seconds, a second
+    # copy; the first to succeed wins and the other is cancelled.
+    first = asyncio.ensure_future(factory())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result(), False
+
+    pending = {first, asyncio.ensure_future(factory())}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+from utils.helpers import to_utc_string
+
+class ReminderScheduler:
+    def __init__(self, fetch, deliver, lookahead=300, refetch_interval=120, catchup=60, max_attempts=3, retry_delay=30, give_up=None):
+        self.fetch = fetch
+        self.deliver = deliver
+        self.give_up = give_up
+        self.lookahead = timedelta(seconds=lookahead)
+        self.refetch_interval = timedelta(seconds=refetch_interval)
+        self.catchup = timedelta(seconds=catchup)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._heap = []
+        self._counter = itertools.count()
+        self._scheduled = set()
+        self._delivered = {}
+        self._attempts = {}
+        self._horizon = None
+        self._last_refill = None
+        self._next_refetch = None
+        self._wakeup = asyncio.Event()
+        self._runner = None
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+
+    def add(self, reminder):
+        rid = reminder.id
+        if rid in self._scheduled or self._delivered.get(rid) == reminder.remind_at:
+            return False
+
+        remind_at = reminder.remind_at
+        if self._horizon is None or remind_at > self._horizon:
+            return False
+
+        self._scheduled.add(rid)
+        heapq.heappush(self._heap, (remind_at, next(self._counter), rid, reminder))
+        if self._heap[0][2] == rid:
+            self._wakeup.set()
+        return True
+
+    def retry(self, reminder, now):
+        rid = reminder.id
+        attempts = self._attempts.get(rid, 0) + 1
+        if attempts >= self.max_attempts:
+            self._attempts.pop(rid, None)
+            print(f"Giving up on reminder {rid} after {attempts} attempts")
+            return False
+
+        self._attempts[rid] = attempts
+        retry_at = now + timedelta(seconds=self.retry_delay * 2 ** (attempts - 1))
+        self._scheduled.add(rid)
+        heapq.heappush(self._heap, (retry_at, next(self._counter), rid, reminder))
+        return True
+
+    def release(self, reminder):
+        # Forget that a popped reminder was handed out, so the next refill
+        # schedules it again (e.g. another process held its claim).
+        if self._delivered.get(reminder.id) == reminder.remind_at:
+            del self._delivered[reminder.id]
+
+    def discard(self, reminder_id):
+        for rid in self._scheduled:
+            if str(rid) == str(reminder_id):
+                self._scheduled.discard(rid)
+                break
+
+    async def refill(self, now):
+        start = min(now, self._last_refill or now) - self.catchup
+        end = now + self.lookahead
+
+        try:
+            reminders = await self.fetch(to_utc_string(start), to_utc_string(end))
+        except Exception as e:
+            print(f"Failed to fetch reminders: {e}")
+            reminders = None
+
+        if reminders is None:
+            self._next_refetch = now + min(self.refetch_interval, timedelta(seconds=30))
+            return
+
+        self._horizon = end
+        self._last_refill = now
+        self._next_refetch = now + self.refetch_interval
+        self._delivered = {rid: at for rid, at in self._delivered.items() if at > start}
+        for reminder in reminders:
+            self.add(reminder)
+
+    def pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, rid, reminder = heapq.heappop(self._heap)
+            if rid not in self._scheduled:
+                continue
+            self._scheduled.discard(rid)
+            self._delivered[rid] = reminder.remind_at
+            due.append(reminder)
+        return due
+
+    async def run(self):
+        while True:
+            now = datetime.now(timezone.utc)
+            if self._next_refetch is None or now >= self._next_refetch:
+                await self.refill(now)
+
+            due = self.pop_due(now)
+            if due:
+                try:
+                    failed = await self.deliver(due)
+                except Exception as e:
+                    print(f"Failed to deliver reminders: {e}")
+                    failed = due
+
+                failed = failed or []
+                failed_ids = {r.id for r in failed}
+                for reminder in due:
+                    if reminder.id not in failed_ids:
+                        self._attempts.pop(reminder.id, None)
+                given_up = [r for r in failed if not self.retry(r, now)]
+                if given_up and self.give_up:
+                    try:
+                        await self.give_up(given_up)
+                    except Exception as e:
+                        print(f"Failed to hand over {len(given_up)} reminders given up on: {e}")
+                continue
+
+            deadline = self._next_refetch
+            if self._heap and self._heap[0][0] < deadline:
+                deadline = self._heap[0][0]
+
+            self._wakeup.clear()
+            timeout = max((deadline - datetime.now(timezone.utc)).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,117 @@
+import re
+from collections import OrderedDict
+
+WORD = re.compile(r"\w+")
+MAX_TERMS = 8
+
+def search_terms(query):
+    terms = []
+    for term in WORD.findall(query.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+def matches(text, terms):
+    text = text.lower()
+    return all(term in text for term in terms)
+
+def relevance(text, terms):
+    # Per term: 3 for a whole word, 2 for a word prefix, 1 anywhere else.
+    words = WORD.findall(text.lower())
+    score = 0
+    for term in terms:
+        if term in words:
+            score += 3
+        elif any(word.startswith(term) for word in words):
+            score += 2
+        elif any(term in word for word in words):
+            score += 1
+    return score
+
+def rank(rows, terms, limit):
+    # Highest priority (1) first, then the closest matches, then oldest.
+    ordered = sorted(rows, key=lambda row: (int(row["priority"]), -relevance(row["task"], terms), int(row["id"])))
+    return ordered[:limit]
+
+class TrigramIndex:
+    # Trigram postings over each user's task words, built on the user's first
+    # search and kept for the max_users most recent searchers. A posting
+    # intersection only narrows the candidates; matches() confirms them.
+    # generation moves on every change so a build that raced a write can be
+    # thrown away.
+    def __init__(self, max_users=1000):
+        self.max_users = max_users
+        self.users = OrderedDict()
+        self.owners = {}
+        self.generation = 0
+
+    def __contains__(self, user_id):
+        return user_id in self.users
+
+    def build(self, user_id, rows, generation):
+        if generation != self.generation:
+            return False
+        self.users[user_id] = ({}, {})
+        for row in rows:
+            self._index(user_id, row)
+        if len(self.users) > self.max_users:
+            _, (docs, _) = self.users.popitem(last=False)
+            for task_id in docs:
+                self.owners.pop(task_id, None)
+        return True
+
+    def _index(self, user_id, row):
+        docs, postings = self.users[user_id]
+        task_id = int(row["id"])
+        docs[task_id] = row
+        self.owners[task_id] = user_id
+        for word in WORD.findall(row["task"].lower()):
+            for gram in trigrams(word):
+                postings.setdefault(gram, set()).add(task_id)
+
+    def add(self, user_id, row):
+        self.generation += 1
+        if user_id in self.users:
+            self._index(user_id, row)
+
+    def discard(self, task_id):
+        self.generation += 1
+        user_id = self.owners.pop(int(task_id), None)
+        if user_id is None or user_id not in self.users:
+            return
+        docs, postings = self.users[user_id]
+        row = docs.pop(int(task_id), None)
+        if row is None:
+            return
+        for word in WORD.findall(row["task"].lower()):
+            for gram in trigrams(word):
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(int(task_id))
+                    if not ids:
+                        del postings[gram]
+
+    def forget(self, user_id):
+        self.generation += 1
+        entry = self.users.pop(user_id, None)
+        if entry:
+            for task_id in entry[0]:
+                self.owners.pop(task_id, None)
+
+    def search(self, user_id, terms, limit):
+        self.users.move_to_end(user_id)
+        docs, postings = self.users[user_id]
+        candidates = None
+        for term in terms:
+            # Terms shorter than three characters have no trigrams and are
+            # only checked by matches().
+            for gram in trigrams(term):
+                ids = postings.get(gram, set())
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+        rows = docs.values() if candidates is None else (docs[task_id] for task_id in candidates)
+        return rank([row for row in rows if matches(row["task"], terms)], terms, limit)
@@ -0,0 +1,27 @@
+from config import SHARD_COUNT, CLUSTER_COUNT, CLUSTER_ID, OWNERSHIP_BUCKETS
+
+CLUSTERED = CLUSTER_COUNT > 1
+
+def user_bucket(user_id):
+    return int(user_id) % OWNERSHIP_BUCKETS
+
+def owned_buckets(cluster_id=CLUSTER_ID, cluster_count=CLUSTER_COUNT):
+    start = OWNERSHIP_BUCKETS * cluster_id // cluster_count
+    end = OWNERSHIP_BUCKETS * (cluster_id + 1) // cluster_count
+    return start, end
+
+def owns_user(user_id):
+    if not CLUSTERED:
+        return True
+    start, end = owned_buckets()
+    return start <= user_bucket(user_id) < end
+
+def bucket_filter():
+    return owned_buckets() if CLUSTERED else None
+
+def cluster_shard_ids(cluster_id=CLUSTER_ID, cluster_count=CLUSTER_COUNT, shard_count=SHARD_COUNT):
+    if shard_count is None:
+        if cluster_count > 1:
+            raise ValueError("SHARD_COUNT must be set when CLUSTER_COUNT is greater than 1")
+        return None
+    return [shard_id for shard_id in range(shard_count) if shard_id % cluster_count == cluster_id]
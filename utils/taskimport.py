@@ -0,0 +1,95 @@
+import csv
+from collections import deque
+import httpx
+from config import HTTP_TIMEOUT
+
+# Import files hold one task per line. CSV files have the task in the first
+# column and an optional priority (1-3) in the second, with an optional
+# "task,priority" header (quoted fields may span lines); plain text lines are
+# tasks at medium priority.
+
+MAX_TASK_LENGTH = 200
+DEFAULT_PRIORITY = 2
+HEADER_NAMES = ("task", "tasks", "description")
+
+def is_csv(attachment):
+    content_type = (attachment.content_type or "").split(";")[0].strip()
+    return attachment.filename.lower().endswith(".csv") or content_type in ("text/csv", "application/csv")
+
+def is_text(attachment):
+    content_type = (attachment.content_type or "").split(";")[0].strip()
+    return is_csv(attachment) or content_type.startswith("text/") or attachment.filename.lower().endswith(".txt")
+
+async def stream_lines(url, max_bytes):
+    # Lines arrive as the download progresses, so a large file is never held
+    # in memory as a whole; max_bytes stops uploads that lied about their size.
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            size, first = 0, True
+            async for line in response.aiter_lines():
+                size += len(line.encode()) + 1
+                if size > max_bytes:
+                    raise ValueError(f"file is larger than {max_bytes // 1024} KiB")
+                if first:
+                    line = line.lstrip("\ufeff")
+                    first = False
+                yield line
+
+class _Lines:
+    # The lines fed so far. csv.reader only asks for more once a whole record
+    # is waiting, or at the end of the file.
+    def __init__(self):
+        self.pending = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.pending:
+            raise StopIteration
+        return self.pending.popleft()
+
+async def read_records(lines, csv_format):
+    # (line number, fields) per record. CSV goes through a single csv.reader;
+    # lines are held back while a quoted field is still open, so fields may
+    # span lines without the reader ever seeing half a record.
+    if not csv_format:
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            yield line_number, [line]
+        return
+
+    # An odd number of quotes so far means a quoted field is still open. A
+    # stray quote inside an unquoted field only delays the records after it.
+    source = _Lines()
+    reader = csv.reader(source)
+    quoted = False
+    async for line in lines:
+        source.pending.append(line + "\n")
+        quoted ^= line.count('"') % 2 == 1
+        while not quoted and source.pending:
+            fields = next(reader)
+            yield reader.line_num, fields
+    # An unterminated quote runs to the end of the file.
+    while source.pending:
+        fields = next(reader)
+        yield reader.line_num, fields
+
+def parse_record(fields, csv_format):
+    # (task, priority), None for a blank line or CSV header, or ValueError.
+    task = fields[0].strip() if fields else ""
+    priority = fields[1].strip() if csv_format and len(fields) > 1 else ""
+    if csv_format and task.lower() in HEADER_NAMES and not priority.isdigit():
+        return None
+
+    if not task:
+        return None
+    if len(task) > MAX_TASK_LENGTH:
+        raise ValueError(f"longer than {MAX_TASK_LENGTH} characters")
+    if not priority:
+        return task, DEFAULT_PRIORITY
+    if priority not in ("1", "2", "3"):
+        raise ValueError(f"priority {priority!r} is not 1, 2 or 3")
+    return task, int(priority)
@@ -1,54 +1,151 @@
 import discord
 from discord.ui import View, Select
 from models.database import Database
+from models.errors import StorageError, describe
+from utils.helpers import truncate
+from utils.interactions import deadline_aware, reply, edit
 
 class DeletableDropdown(View):
-    def __init__(self, data, is_task: bool):
+    def __init__(self, data, is_task: bool, on_delete=None):
         super().__init__()
-        self.add_item(self.DeletionSelect(data, is_task))
+        self.add_item(self.DeletionSelect(data, is_task, on_delete))
 
     class DeletionSelect(Select):
-        def __init__(self, data, is_task):
+        def __init__(self, data, is_task, on_delete=None, start=1):
             options = [
                 discord.SelectOption(
-                    label=f"{i+1}. {d['task'][:45] + '...' if len(d.get('task', '')) > 45 else d.get('task', '')}",
-                    value=str(d["id"])
-                ) if is_task else discord.SelectOption(
-                    label=f"{i+1}. {d['message'][:45] + '...' if len(d.get('message', '')) > 45 else d.get('message', '')}",
-                    value=str(d["id"])
+                    label=f"{i}. {truncate(d.task if is_task else d.message, 48)}",
+                    value=str(d.id)
                 )
-                for i, d in enumerate(data)
+                for i, d in enumerate(data, start)
             ]
-            placeholder = "Select a task to delete" if is_task else "Select a reminder to delete"
-            super().__init__(placeholder=placeholder, options=options, min_values=1, max_values=1)
+            placeholder = "Select tasks to delete" if is_task else "Select reminders to delete"
+            super().__init__(placeholder=placeholder, options=options, min_values=1, max_values=len(options))
             self.data = data
             self.is_task = is_task
+            self.on_delete = on_delete
 
+        @deadline_aware()
         async def callback(self, interaction: discord.Interaction):
-            target_id = self.values[0]
-            table = "tasks" if self.is_task else "reminders"
+            # Every selected row goes in a single id=in.(...) delete.
+            target_ids = list(self.values)
 
             try:
                 if self.is_task:
-                    await Database.delete_task(target_id)
+                    await Database.delete_tasks(target_ids, interaction.user.id)
                 else:
-                    await Database.delete_reminder(target_id)
+                    await Database.delete_reminders(target_ids, [interaction.user.id])
             except Exception as e:
-                await interaction.response.send_message(
+                await reply(
+                    interaction,
                     embed=discord.Embed(
                         title="❌ Error",
-                        description=f"Failed to delete: {e}",
+                        description=f"Failed to delete: {describe(e)}",
                         color=0xff0000
                     ),
                     ephemeral=True
                 )
                 return
 
-            await interaction.response.send_message(
+            if self.on_delete:
+                for target_id in target_ids:
+                    self.on_delete(target_id)
+
+            kind = "task" if self.is_task else "reminder"
+            await reply(
+                interaction,
                 embed=discord.Embed(
                     title="🗑️ Deleted",
-                    description="Successfully removed!",
+                    description=f"Removed {len(target_ids)} {kind}{'s' if len(target_ids) != 1 else ''}.",
                     color=0x00ff00
                 ),
                 ephemeral=True
             )
+
+class PaginatedList(View):
+    # Holds one page of rows at a time; the previous/next buttons fetch the
+    # neighbouring page from storage with the sort key of the edge row.
+    def __init__(self, user_id, fetch_page, key, render, is_task: bool, on_delete=None):
+        super().__init__()
+        self.user_id = user_id
+        self.fetch_page = fetch_page
+        self.key = key
+        self.render = render
+        self.is_task = is_task
+        self.on_delete = on_delete
+        self.items = []
+        self.offset = 0
+        self.select = None
+
+    async def load(self, cursor=None, backward=False):
+        items, more = await self.fetch_page(self.user_id, cursor, backward)
+        if items is None:
+            return False
+
+        if cursor is not None and not items:
+            return await self.load()
+
+        return self.show(items, more, cursor, backward)
+
+    def show(self, items, more, cursor=None, backward=False):
+        # Also used directly for a first page the command already fetched.
+        if cursor is None:
+            self.offset = 0
+        elif backward:
+            self.offset = max(self.offset - len(items), 0)
+        else:
+            self.offset += len(self.items)
+
+        self.items = items
+        if backward:
+            self.previous_page.disabled = not more
+            self.next_page.disabled = False
+        else:
+            self.previous_page.disabled = self.offset == 0
+            self.next_page.disabled = not more
+
+        if self.select:
+            self.remove_item(self.select)
+            self.select = None
+        if items:
+            self.select = DeletableDropdown.DeletionSelect(items, self.is_task, self.on_delete, self.offset + 1)
+            self.select.row = 0
+            self.add_item(self.select)
+        return True
+
+    def embed(self):
+        return self.render(self.items, self.offset)
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.user_id
+
+    @deadline_aware()
+    async def turn(self, interaction, backward):
+        edge = self.items[0] if backward else self.items[-1]
+        try:
+            loaded = await self.load(self.key(edge), backward)
+        except StorageError as e:
+            print(f"Failed to load a page for {self.user_id}: {e}")
+            loaded = False
+            reason = describe(e)
+        else:
+            reason = "please try again"
+        if not loaded:
+            return await reply(
+                interaction,
+                embed=discord.Embed(
+                    title="❌ Error",
+                    description=f"Failed to load the page, {reason}.",
+                    color=0xff0000
+                ),
+                ephemeral=True
+            )
+        await edit(interaction, embed=self.embed(), view=self)
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary, row=1)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.turn(interaction, backward=True)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary, row=1)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.turn(interaction, backward=False)
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from utils.metrics import LOOP_LAG, LOOP_STALLS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def culprit(stack):
+    # The innermost frame from our own code, falling back to the innermost
+    # frame overall when the loop is stuck inside a library.
+    for filename, lineno, name, _ in reversed(stack):
+        if filename.startswith(PROJECT_ROOT) and not filename.endswith("watchdog.py"):
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{lineno} in {name}"
+    filename, lineno, name, _ = stack[-1]
+    return f"{filename}:{lineno} in {name}"
+
+class LoopWatchdog:
+    # A heartbeat task stamps the event loop every interval seconds. A daemon
+    # thread checks the stamp, and while the loop is late by more than
+    # threshold seconds it samples the loop thread's stack so the blocking
+    # callback can be named once the loop recovers.
+    def __init__(self, interval=0.25, threshold=0.5, sample_interval=0.05, max_samples=50, history=100):
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.last_beat = time.monotonic()
+        self.handlers = {}
+        self.history = history
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._loop_thread = None
+        self._thread = None
+        self._heartbeat = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._loop_thread = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _beat(self):
+        while True:
+            started = time.monotonic()
+            self.last_beat = started
+            await asyncio.sleep(self.interval)
+            LOOP_LAG.observe(max(time.monotonic() - started - self.interval, 0))
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return None
+        return tuple((f.filename, f.lineno, f.name, f.line) for f in traceback.extract_stack(frame)[-20:])
+
+    def _watch(self):
+        stall = None
+        while not self._stopped.wait(self.sample_interval):
+            beat = self.last_beat
+            lag = time.monotonic() - beat - self.interval
+
+            if stall is not None and (stall["beat"] != beat or lag <= self.threshold):
+                self._finish(stall)
+                stall = None
+
+            if lag > self.threshold:
+                if stall is None:
+                    stall = {"beat": beat, "lag": lag, "samples": Counter()}
+                stall["lag"] = lag
+                if sum(stall["samples"].values()) < self.max_samples:
+                    stack = self._sample()
+                    if stack:
+                        stall["samples"][stack] += 1
+
+    def _finish(self, stall):
+        LOOP_STALLS.inc()
+        if not stall["samples"]:
+            return
+
+        stack, hits = stall["samples"].most_common(1)[0]
+        name = culprit(stack)
+        lag = stall["lag"]
+        print(
+            f"Event loop blocked for {lag:.2f}s in {name} ({hits}/{sum(stall['samples'].values())} samples):\n"
+            + "".join(traceback.format_list(stack))
+        )
+
+        with self._lock:
+            count, total, worst = self.handlers.get(name, (0, 0.0, 0.0))
+            self.handlers[name] = (count + 1, total + lag, max(worst, lag))
+            if len(self.handlers) > self.history:
+                del self.handlers[min(self.handlers, key=lambda key: self.handlers[key][2])]
+
+    def report(self, limit=10):
+        with self._lock:
+            slowest = sorted(self.handlers.items(), key=lambda item: item[1][2], reverse=True)
+        return [(name, count, total, worst) for name, (count, total, worst) in slowest[:limit]]